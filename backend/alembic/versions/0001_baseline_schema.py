@@ -0,0 +1,194 @@
+"""baseline schema
+
+Every table as created by Base.metadata.create_all before Alembic was
+introduced, including the captcha reaper indexes and refresh token
+families. Existing databases brought up to date with the migrate_*.py
+scripts should be stamped instead of upgraded: ``alembic stamp 0001``.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 06:19:37.838202
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('captchas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('captcha_id', sa.String(length=50), nullable=False),
+    sa.Column('captcha_text', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('is_used', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_captchas_captcha_id'), 'captchas', ['captcha_id'], unique=True)
+    op.create_index('ix_captchas_expires_at', 'captchas', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_captchas_id'), 'captchas', ['id'], unique=False)
+    op.create_index('ix_captchas_used', 'captchas', ['id'], unique=False, postgresql_where=sa.text('is_used'))
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=100), nullable=False),
+    sa.Column('last_name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.Column('username', sa.String(length=100), nullable=True),
+    sa.Column('designation', sa.String(length=100), nullable=True),
+    sa.Column('gender', sa.String(length=20), nullable=True),
+    sa.Column('email_id', sa.String(length=255), nullable=True),
+    sa.Column('personal_email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('user_type', sa.JSON(), nullable=True),
+    sa.Column('product_access', sa.JSON(), nullable=True),
+    sa.Column('additional_contacts', sa.JSON(), nullable=True),
+    sa.Column('is_fresh', sa.Boolean(), nullable=True),
+    sa.Column('is_profile_updated', sa.Boolean(), nullable=True),
+    sa.Column('is_existing_user', sa.Boolean(), nullable=True),
+    sa.Column('is_exisiting_user', sa.Boolean(), nullable=True),
+    sa.Column('is_test_user', sa.Boolean(), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('deleted_on', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('pending_req_count', sa.Integer(), nullable=True),
+    sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('tnc_url', sa.Text(), nullable=True),
+    sa.Column('tnc_accepted', sa.Boolean(), nullable=True),
+    sa.Column('is_parichay', sa.Boolean(), nullable=True),
+    sa.Column('org_type', sa.String(length=100), nullable=True),
+    sa.Column('org_name', sa.String(length=255), nullable=True),
+    sa.Column('org_details', sa.JSON(), nullable=True),
+    sa.Column('stage_completed', sa.String(length=100), nullable=True),
+    sa.Column('is_external', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('associated_managers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('application_name', sa.String(length=255), nullable=False),
+    sa.Column('manager_email', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_associated_managers_id'), 'associated_managers', ['id'], unique=False)
+    op.create_table('mou_infos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('mou_format', sa.String(length=100), nullable=True),
+    sa.Column('mou_custom_file_upload', sa.String(length=500), nullable=True),
+    sa.Column('mou_custom_filename', sa.String(length=255), nullable=True),
+    sa.Column('mou_status', sa.String(length=100), nullable=True),
+    sa.Column('remarks', sa.Text(), nullable=True),
+    sa.Column('mou_requested_by', sa.String(length=255), nullable=True),
+    sa.Column('requested_on', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_on', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('deleted_on', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mou_infos_id'), 'mou_infos', ['id'], unique=False)
+    op.create_table('organizations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('org_name', sa.String(length=255), nullable=False),
+    sa.Column('org_type', sa.String(length=100), nullable=False),
+    sa.Column('org_website', sa.String(length=500), nullable=True),
+    sa.Column('ministry_name', sa.String(length=255), nullable=True),
+    sa.Column('department_name', sa.String(length=255), nullable=True),
+    sa.Column('address_type', sa.String(length=50), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('pincode', sa.String(length=10), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('city', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_organizations_id'), 'organizations', ['id'], unique=False)
+    op.create_table('reference_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('blob_file_name', sa.String(length=500), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=False),
+    sa.Column('uploaded_by', sa.String(length=255), nullable=False),
+    sa.Column('uploaded_on', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reference_documents_id'), 'reference_documents', ['id'], unique=False)
+    op.create_table('refresh_token_families',
+    sa.Column('family_id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('min_generation', sa.Integer(), nullable=False),
+    sa.Column('revoked', sa.Boolean(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('family_id')
+    )
+    op.create_index(op.f('ix_refresh_token_families_expires_at'), 'refresh_token_families', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_refresh_token_families_updated_at'), 'refresh_token_families', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_refresh_token_families_user_id'), 'refresh_token_families', ['user_id'], unique=False)
+    op.create_table('supervisor_details',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=100), nullable=False),
+    sa.Column('last_name', sa.String(length=100), nullable=False),
+    sa.Column('official_email', sa.String(length=255), nullable=False),
+    sa.Column('designation', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('id_proof', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_supervisor_details_id'), 'supervisor_details', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_supervisor_details_id'), table_name='supervisor_details')
+    op.drop_table('supervisor_details')
+    op.drop_index(op.f('ix_refresh_token_families_user_id'), table_name='refresh_token_families')
+    op.drop_index(op.f('ix_refresh_token_families_updated_at'), table_name='refresh_token_families')
+    op.drop_index(op.f('ix_refresh_token_families_expires_at'), table_name='refresh_token_families')
+    op.drop_table('refresh_token_families')
+    op.drop_index(op.f('ix_reference_documents_id'), table_name='reference_documents')
+    op.drop_table('reference_documents')
+    op.drop_index(op.f('ix_organizations_id'), table_name='organizations')
+    op.drop_table('organizations')
+    op.drop_index(op.f('ix_mou_infos_id'), table_name='mou_infos')
+    op.drop_table('mou_infos')
+    op.drop_index(op.f('ix_associated_managers_id'), table_name='associated_managers')
+    op.drop_table('associated_managers')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index('ix_captchas_used', table_name='captchas', postgresql_where=sa.text('is_used'))
+    op.drop_index(op.f('ix_captchas_id'), table_name='captchas')
+    op.drop_index('ix_captchas_expires_at', table_name='captchas')
+    op.drop_index(op.f('ix_captchas_captcha_id'), table_name='captchas')
+    op.drop_table('captchas')
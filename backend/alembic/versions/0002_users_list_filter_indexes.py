@@ -0,0 +1,60 @@
+"""users list filter indexes
+
+Partial (column, id) btree indexes for the role, org_type, status and
+is_test_user filters, a created_at index for date ranges, and on Postgres a
+pg_trgm GIN index on the search expression (app.models.user.USER_SEARCH_TEXT).
+On Postgres the indexes are built CONCURRENTLY so a populated users table
+stays writable while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 07:05:12.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FILTER_INDEXES = (
+    ('ix_users_role_id', ['role', 'id']),
+    ('ix_users_org_type_id', ['org_type', 'id']),
+    ('ix_users_status_id', ['status', 'id']),
+    ('ix_users_is_test_user_id', ['is_test_user', 'id']),
+)
+
+SEARCH_TEXT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' "
+    "|| email || ' ' || coalesce(email_id, ''))"
+)
+
+
+def upgrade() -> None:
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        if postgres:
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, columns in FILTER_INDEXES:
+            op.create_index(
+                name, 'users', columns, unique=False,
+                postgresql_where=sa.text('is_deleted = false'), sqlite_where=sa.text('is_deleted = 0'),
+                postgresql_concurrently=True
+            )
+        op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False, postgresql_concurrently=True)
+        if postgres:
+            op.execute(f'CREATE INDEX CONCURRENTLY ix_users_search_trgm ON users USING gin ({SEARCH_TEXT} gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_search_trgm', table_name='users')
+    op.drop_index('ix_users_created_at', table_name='users')
+    for name, _ in reversed(FILTER_INDEXES):
+        op.drop_index(name, table_name='users')
@@ -0,0 +1,34 @@
+"""users changed-at index
+
+Expression index on coalesce(updated_at, created_at)
+(app.models.user.USER_CHANGED_AT), so the users list ETag's max() is a
+single index lookup. Built CONCURRENTLY on Postgres.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:12:44.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_changed_at', 'users', [sa.text('coalesce(updated_at, created_at)')],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_changed_at', table_name='users')
@@ -0,0 +1,35 @@
+"""opaque refresh tokens
+
+Refresh tokens become opaque ``family.generation.secret`` strings checked
+against a SHA-256 of the secret on refresh_token_families. Families issued
+with JWT refresh tokens have no secret to check, so they are deleted: those
+sessions sign in again.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:02:18.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text('DELETE FROM refresh_token_families'))
+    with op.batch_alter_table('refresh_token_families') as batch_op:
+        batch_op.add_column(sa.Column('secret_hash', sa.String(length=64), nullable=False))
+
+
+def downgrade() -> None:
+    op.execute(sa.text('DELETE FROM refresh_token_families'))
+    with op.batch_alter_table('refresh_token_families') as batch_op:
+        batch_op.drop_column('secret_hash')
@@ -1,23 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.replicas import replica_router
 from app.schemas.user import (
     SigninRequest, SigninResponse, SignupRequest, SignupResponse, CaptchaResponse, 
-    UserProfileResponse, UsersListResponse
+    UserProfileResponse, UsersFilter, UsersListResponse, RefreshTokenRequest, RefreshTokenResponse, SignoutResponse
 )
 from app.services.auth_service import authenticate_user, create_user
-from app.services.user_service import get_user_profile_by_id, get_all_users_profiles
-from app.services.captcha_service import create_captcha
-from typing import Dict, Any, Optional
+from app.services.user_service import (
+    export_users, get_user_profile_by_id, get_all_users_profiles, get_user_version, get_users_count,
+    get_users_last_changed, parse_profile_fields
+)
+from app.core.config import settings
+from app.utils.security import get_current_user
+from app.utils.etag import etag_matches, weak_etag
+from app.utils.fast_json import FastJSONResponse
+from app.utils.streaming import encode_stream, gzip_stream
+from app.services.token_service import refresh_access_token, revoke_refresh_token
+from app.services.captcha_service import create_captcha, get_captcha_image, CAPTCHA_MEDIA_TYPES
+from typing import Dict, Any, Literal, Optional
+from datetime import datetime
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
 
 
-@router.post("/captcha", response_model=CaptchaResponse)
-async def get_captcha(db: Session = Depends(get_db)):
+@router.post("/captcha", response_model=CaptchaResponse, response_model_exclude_none=True)
+async def get_captcha(
+    request: Request,
+    image: Literal["inline", "url"] = Query("inline", description="Embed the image as base64 or return a URL to fetch it from"),
+    db: AsyncSession = Depends(get_db)
+):
     """Generate a new captcha"""
+    if image == "url" and settings.CAPTCHA_STATELESS:
+        # Stateless captchas keep no text to re-render from, so the image would
+        # only exist in this worker's cache and other workers would 404 on it
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="image=url is not available with stateless captchas; use image=inline"
+        )
     try:
-        captcha_data = create_captcha(db)
+        captcha_data = await create_captcha(db, inline_image=image == "inline")
+        if image == "url":
+            captcha_data["image_url"] = str(request.url_for(
+                "get_captcha_image_file",
+                captcha_id=captcha_data["captcha_id"],
+                image_format=settings.CAPTCHA_IMAGE_FORMAT.lower()
+            ))
         return CaptchaResponse(captcha=captcha_data)
     except Exception as e:
         raise HTTPException(
@@ -26,11 +59,37 @@ async def get_captcha(db: Session = Depends(get_db)):
         )
 
 
+@router.get("/captcha/{captcha_id}.{image_format}", name="get_captcha_image_file")
+async def get_captcha_image_file(captcha_id: str, image_format: str, db: AsyncSession = Depends(get_db)):
+    """Serve the raw captcha image bytes"""
+    if image_format.lower() != settings.CAPTCHA_IMAGE_FORMAT.lower():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Captcha image not found"
+        )
+
+    image_bytes = await get_captcha_image(db, captcha_id)
+    if image_bytes is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Captcha image not found"
+        )
+
+    # The image behind a captcha id never changes, but must not land in shared caches
+    return Response(
+        content=image_bytes,
+        media_type=CAPTCHA_MEDIA_TYPES[image_format.lower()],
+        headers={
+            "Cache-Control": f"private, max-age={settings.CAPTCHA_EXPIRE_MINUTES * 60}, immutable"
+        }
+    )
+
+
 @router.post("/signin", response_model=SigninResponse)
-async def signin(signin_request: SigninRequest, db: Session = Depends(get_db)):
+async def signin(signin_request: SigninRequest, db: AsyncSession = Depends(get_db)):
     """User signin with captcha verification"""
     try:
-        response = authenticate_user(db, signin_request)
+        response = await authenticate_user(db, signin_request)
         return response
     except HTTPException:
         raise
@@ -41,27 +100,32 @@ async def signin(signin_request: SigninRequest, db: Session = Depends(get_db)):
         )
 
 
+@router.post("/token/refresh", response_model=RefreshTokenResponse)
+async def refresh_token(refresh_request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access token, rotating the refresh token"""
+    return RefreshTokenResponse(**await refresh_access_token(db, refresh_request.refresh_token))
+
+
+@router.post("/signout", response_model=SignoutResponse)
+async def signout(refresh_request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke the session a refresh token belongs to"""
+    await revoke_refresh_token(db, refresh_request.refresh_token)
+    return SignoutResponse(message="Signed out")
+
+
 @router.post("/signup", response_model=SignupResponse)
 async def signup(
     signup_request: SignupRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Customer signup with JSON data"""
-    print(f"[DEBUG] Signup endpoint called for: {signup_request.email_id}")
-    
     try:
         # Create user
-        print("[DEBUG] Calling create_user function...")
-        response = create_user(db, signup_request)
-        print(f"[DEBUG] User created successfully: {response}")
-        
+        response = await create_user(db, signup_request)
         return SignupResponse(**response)
         
     except Exception as e:
-        print(f"[DEBUG] Unexpected error in signup: {e}")
-        print(f"[DEBUG] Error type: {type(e)}")
-        import traceback
-        print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+        logger.exception("user.signup_failed", extra={"email": signup_request.email_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Signup failed: {str(e)}"
@@ -69,16 +133,61 @@ async def signup(
 
 
 # User Profile APIs
+def users_filter(
+    role: Optional[str] = Query(None, description="Only users with this role"),
+    org_type: Optional[str] = Query(None, description="Only users with this organization type"),
+    user_status: Optional[str] = Query(None, alias="status", description="Only users with this status"),
+    is_test_user: Optional[bool] = Query(None, description="Only test users (true) or real users (false)"),
+    created_from: Optional[datetime] = Query(None, description="Created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Created before this time"),
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Case-insensitive substring of name or email")
+) -> UsersFilter:
+    """Users list filters shared by /users and /users/export"""
+    return UsersFilter(
+        role=role, org_type=org_type, status=user_status, is_test_user=is_test_user,
+        created_from=created_from, created_to=created_to, search=search
+    )
+
+
 @router.get("/users", response_model=UsersListResponse)
 async def get_all_users(
     skip: int = Query(0, ge=0, description="Number of users to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of users to return"),
     include_deleted: bool = Query(False, description="Include deleted users"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides skip"),
+    count: Optional[Literal["exact", "estimate", "cached", "none"]] = Query(
+        None, description="How to compute total; defaults to USERS_COUNT_DEFAULT_MODE"
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields to return, e.g. first_name,email_id,role"),
+    filters: UsersFilter = Depends(users_filter),
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
 ):
-    """Get all users with pagination"""
+    """Get all users with offset or cursor pagination and optional filters"""
+    requested_fields = parse_profile_fields(fields)
+    count = count or settings.USERS_COUNT_DEFAULT_MODE
+
+    async def read(db: AsyncSession) -> Response:
+        # An exact total is needed for the page anyway; counting it first also
+        # lets the ETag notice hard deletes, and the page reuses it
+        total = await get_users_count(db, include_deleted, filters) if count == "exact" else None
+        last_changed = await get_users_last_changed(db)
+        etag = weak_etag("users", last_changed, total, skip, limit, include_deleted, cursor, count, requested_fields, filters)
+        headers = {"ETag": etag, "Cache-Control": settings.USERS_CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        result = await get_all_users_profiles(
+            db, skip, limit, include_deleted, cursor, count, requested_fields, filters, total
+        )
+        # Already UsersListResponse-shaped data; serialized once, without re-validation
+        return FastJSONResponse(result, headers=headers)
+
     try:
-        return get_all_users_profiles(db, skip, limit, include_deleted)
+        # Runs on a replica when one is usable, once more on the primary if it fails
+        return await replica_router.read(read)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,11 +195,55 @@ async def get_all_users(
         )
 
 
+@router.get("/users/export")
+async def export_users_route(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson (one profile per line) or csv"),
+    gzip: bool = Query(False, description="Gzip the file (.gz download)"),
+    include_deleted: bool = Query(False, description="Include deleted users"),
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields to export; all by default"),
+    filters: UsersFilter = Depends(users_filter),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream every matching user as NDJSON or CSV in constant memory"""
+    requested_fields = parse_profile_fields(fields)
+
+    def body(db: AsyncSession):
+        # The session lives inside stream_read so it stays open while streaming
+        chunks = encode_stream(export_users(db, export_format, requested_fields, include_deleted, filters))
+        return gzip_stream(chunks) if gzip else chunks
+
+    filename = "users." + export_format + (".gz" if gzip else "")
+    return StreamingResponse(
+        replica_router.stream_read(body),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/users/{user_id}", response_model=UserProfileResponse)
-async def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
+async def get_user_by_id(
+    user_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields to return"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
     """Get user profile by ID"""
+    requested_fields = parse_profile_fields(fields)
+
+    async def read(db: AsyncSession) -> Response:
+        version = await get_user_version(db, user_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        etag = weak_etag("user", user_id, version, requested_fields)
+        headers = {"ETag": etag, "Cache-Control": settings.USERS_CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        result = await get_user_profile_by_id(db, user_id, requested_fields)
+        return FastJSONResponse(result, headers=headers)
+
     try:
-        return get_user_profile_by_id(db, user_id)
+        return await replica_router.read(read)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from app.core.database import database_stats
+from app.core.logging_config import logging_stats
+from app.core.replicas import replica_router
+from app.utils.security import get_current_user, password_hashing_pool, token_claims_cache
+from app.services.token_service import refresh_token_flusher, refresh_token_store
+from app.services.user_service import users_count_cache
+from app.services.captcha_service import captcha_pool, captcha_images, captcha_reaper, used_captcha_tokens
+
+# Pool, cache and replica internals: signed-in callers only
+router = APIRouter(dependencies=[Depends(get_current_user)])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Runtime counters for sizing background pools and caches"""
+    return {
+        "captcha_pool": captcha_pool.stats(),
+        "captcha_images": captcha_images.stats(),
+        "captcha_used_tokens": len(used_captcha_tokens),
+        "captcha_reaper": captcha_reaper.stats(),
+        "token_claims_cache": token_claims_cache.stats(),
+        "password_hashing": password_hashing_pool.stats(),
+        "refresh_tokens": {
+            **refresh_token_store.stats(),
+            "flusher": refresh_token_flusher.stats()
+        },
+        "users_count_cache": users_count_cache.stats(),
+        "database": database_stats(),
+        "replicas": replica_router.stats(),
+        "logging": logging_stats()
+    }
+
+
+@router.get("/metrics/database")
+async def get_database_metrics():
+    """Live connection pool stats: checked out, overflow, checkout wait time"""
+    return {**database_stats(), "replicas": replica_router.stats()}
@@ -1,22 +1,87 @@
+from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.utils.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine, pool_stats
+from app.utils.statement_cache import instrument_statement_cache, statement_cache_stats
 
-# Create database engine
-engine = create_engine(settings.DATABASE_URL)
+
+def async_database_url(url: str) -> str:
+    """Swap a sync PostgreSQL driver for asyncpg"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def pool_options() -> dict:
+    """Pool sizing shared by the sync and async engines"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+    }
+
+
+def async_connect_args(url: str) -> dict:
+    """asyncpg arguments; PgBouncer transaction pooling can't keep prepared statements per connection"""
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if not settings.DB_PGBOUNCER:
+        # Server-side prepared statements, kept per connection
+        return {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+# Create database engine (used by scripts and background maintenance threads)
+engine = instrument_engine(create_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    **pool_options()
+))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API request path
+_async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    poolclass=InstrumentedAsyncQueuePool,
+    connect_args=async_connect_args(_async_url),
+    **pool_options()
+)
+instrument_engine(async_engine.sync_engine)
+async_statement_cache = instrument_statement_cache(async_engine.sync_engine)
+
+# Objects stay usable after commit; lazy refreshes would need IO outside await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def database_stats() -> dict:
+    """Live connection pool stats for both engines"""
+    return {
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "async": pool_stats(async_engine.sync_engine),
+        "sync": pool_stats(engine),
+        "statement_cache": statement_cache_stats(async_engine.sync_engine, async_statement_cache),
+    }
@@ -0,0 +1,59 @@
+import logging
+import os
+from typing import Tuple
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """The database is not at the revision this code expects"""
+
+
+def alembic_config() -> Config:
+    """Alembic config for the bundled migrations, usable from any directory"""
+    return Config(ALEMBIC_INI)
+
+
+def expected_revisions() -> Tuple[str, ...]:
+    """Head revisions of the migration scripts shipped with this code"""
+    return tuple(sorted(ScriptDirectory.from_config(alembic_config()).get_heads()))
+
+
+async def check_schema_revision(engine: AsyncEngine) -> dict:
+    """Compare the database's alembic_version with the shipped heads.
+
+    One small SELECT, no DDL and no table inspection, so it is safe for every
+    worker to run at startup. Raises SchemaOutOfDateError when
+    ``DB_SCHEMA_CHECK`` is ``error`` and the revisions differ.
+    """
+    if settings.DB_SCHEMA_CHECK == "off":
+        return {"checked": False}
+
+    async with engine.connect() as connection:
+        current = await connection.run_sync(
+            lambda sync_connection: MigrationContext.configure(sync_connection).get_current_heads()
+        )
+    result = {
+        "checked": True,
+        "current": tuple(sorted(current)),
+        "expected": expected_revisions(),
+    }
+    if result["current"] != result["expected"]:
+        message = (
+            f"Database schema is at {result['current'] or 'no revision'}, "
+            f"expected {result['expected']}; run 'alembic upgrade head'"
+        )
+        if settings.DB_SCHEMA_CHECK == "error":
+            raise SchemaOutOfDateError(message)
+        logger.warning("db.schema_out_of_date", extra=result)
+    return result
@@ -0,0 +1,258 @@
+import itertools
+import logging
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TypeVar
+
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_connect_args, async_database_url, pool_options
+from app.models.user import AssociatedManager, MouInfo, Organization, ReferenceDocument, SupervisorDetail, User
+from app.utils.db_pool import InstrumentedAsyncQueuePool, instrument_engine, pool_stats
+from app.utils.periodic import PeriodicWorker
+
+
+logger = logging.getLogger(__name__)
+
+# Writes to these tables make profile reads stick to the primary for a while;
+# captcha and refresh-token writes don't affect what replicas serve
+PROFILE_TABLES = frozenset(model.__table__ for model in (
+    User, Organization, SupervisorDetail, MouInfo, ReferenceDocument, AssociatedManager
+))
+
+# Replication delay in seconds; 0 when the replica has replayed everything it received
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Errors that mean the replica itself is unreachable or went away mid-query
+# (restart, recovery-conflict cancellation) rather than a bad query
+CONNECTION_ERRORS = (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, OSError)
+
+T = TypeVar("T")
+
+
+def replica_failed(error: Exception) -> bool:
+    return isinstance(error, CONNECTION_ERRORS) or (
+        isinstance(error, exc.DBAPIError) and error.connection_invalidated
+    )
+
+
+class Replica:
+    """One read replica: an async engine for queries and a pool-less one for lag checks"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        async_url = async_database_url(url)
+        self.engine: AsyncEngine = create_async_engine(
+            async_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            connect_args=async_connect_args(async_url),
+            **pool_options()
+        )
+        instrument_engine(self.engine.sync_engine)
+        self._check_engine = create_engine(url, poolclass=NullPool)
+
+        # Unused until the first lag check succeeds
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reads = 0
+        self.failures = 0
+
+    def check(self) -> float:
+        with self._check_engine.connect() as connection:
+            return float(connection.execute(LAG_QUERY).scalar() or 0)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "pool": pool_stats(self.engine.sync_engine),
+        }
+
+
+class ReplicaRouter:
+    """Send read-only calls to a healthy, caught-up replica; everything else to the primary.
+
+    After a committed write to a profile table, reads stay on the primary until
+    ``sticky_seconds`` or the replica's measured lag has passed, whichever is
+    longer, so a worker never reads back older data than it just wrote.
+    """
+
+    def __init__(self, replicas: List[Replica], sticky_seconds: float, max_lag_seconds: float):
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._round_robin = itertools.cycle(replicas) if replicas else None
+        self._lock = threading.Lock()
+        self._last_write = float("-inf")
+
+        # Counters
+        self._primary_reads = 0
+        self._sticky_reads = 0
+        self._fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def mark_write(self):
+        """Record a committed write that replicas may not have replayed yet"""
+        self._last_write = time.monotonic()
+
+    def choose(self) -> Optional[Replica]:
+        """Pick the next usable replica, or None to read from the primary"""
+        if not self.replicas:
+            return None
+        since_write = time.monotonic() - self._last_write
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if not replica.healthy or replica.lag_seconds is None or replica.lag_seconds > self.max_lag_seconds:
+                continue
+            if since_write < max(self.sticky_seconds, replica.lag_seconds):
+                with self._lock:
+                    self._sticky_reads += 1
+                return None
+            return replica
+        return None
+
+    def mark_failed(self, replica: Replica, error: Exception):
+        """Take a replica out of rotation until the next successful lag check"""
+        replica.healthy = False
+        replica.failures += 1
+        replica.last_error = str(error)
+        with self._lock:
+            self._fallbacks += 1
+        logger.warning("db.replica_failed", extra={"replica": replica.name, "error": str(error)})
+
+    def check_lag(self) -> dict:
+        """Measure replication lag on every replica and update their health"""
+        healthy = 0
+        for replica in self.replicas:
+            try:
+                replica.lag_seconds = replica.check()
+                replica.healthy = True
+                replica.last_error = None
+                healthy += 1
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning("db.replica_unreachable", extra={"replica": replica.name, "error": str(e)})
+                replica.healthy = False
+                replica.lag_seconds = None
+                replica.last_error = str(e)
+        return {"checked": len(self.replicas), "healthy": healthy}
+
+    def _primary_read(self) -> AsyncSession:
+        with self._lock:
+            self._primary_reads += 1
+        return AsyncSessionLocal()
+
+    async def read(self, read: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Run ``read(db)`` on a replica, or on the primary if none is usable.
+
+        If the replica fails at any point of the read, connecting or mid-query,
+        it is taken out of rotation and the read runs once more on the primary.
+        """
+        replica = self.choose()
+        if replica is not None:
+            try:
+                async with AsyncSession(bind=replica.engine, autoflush=False, expire_on_commit=False) as db:
+                    result = await read(db)
+                replica.reads += 1
+                return result
+            except Exception as e:
+                if not replica_failed(e):
+                    raise
+                self.mark_failed(replica, e)
+
+        async with self._primary_read() as db:
+            return await read(db)
+
+    async def stream_read(self, stream: Callable[[AsyncSession], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Like ``read`` for a streamed result; the primary can only take over
+        while nothing has been yielded, later replica failures are raised"""
+        replica = self.choose()
+        if replica is not None:
+            started = False
+            try:
+                async with AsyncSession(bind=replica.engine, autoflush=False, expire_on_commit=False) as db:
+                    replica.reads += 1
+                    async for item in stream(db):
+                        started = True
+                        yield item
+                return
+            except Exception as e:
+                if not replica_failed(e):
+                    raise
+                self.mark_failed(replica, e)
+                if started:
+                    raise
+
+        async with self._primary_read() as db:
+            async for item in stream(db):
+                yield item
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict:
+        """Per-replica health and lag plus routing counters"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sticky_seconds": self.sticky_seconds,
+                "max_lag_seconds": self.max_lag_seconds,
+                "primary_reads": self._primary_reads,
+                "sticky_reads": self._sticky_reads,
+                "fallbacks": self._fallbacks,
+                "replicas": [replica.stats() for replica in self.replicas],
+            }
+
+
+replica_router = ReplicaRouter(
+    [
+        Replica(f"replica-{index}", url.strip())
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS.split(","))
+        if url.strip()
+    ],
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS
+)
+
+replica_lag_checker = PeriodicWorker(
+    "replica-lag-check",
+    settings.REPLICA_LAG_CHECK_SECONDS if replica_router.enabled else 0,
+    replica_router.check_lag
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_profile_writes(session, flush_context):
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        if getattr(instance, "__table__", None) in PROFILE_TABLES:
+            session.info["profile_write"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_profile_write(session):
+    if session.info.pop("profile_write", False):
+        replica_router.mark_write()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_profile_write(session, previous_transaction):
+    session.info.pop("profile_write", None)
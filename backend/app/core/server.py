@@ -0,0 +1,86 @@
+import os
+import runpy
+from typing import Any, Optional, Union
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from app.core.config import settings
+from app.utils.hashing_pool import available_cores
+
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "gunicorn.conf.py")
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools, with lifespan required"""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "proxy_headers": True,
+    }
+
+
+def worker_count(configured: Optional[int] = None) -> int:
+    """One event loop per core unless SERVER_WORKERS says otherwise"""
+    configured = settings.SERVER_WORKERS if configured is None else configured
+    if configured > 0:
+        return configured
+    return available_cores()
+
+
+def check_multi_worker(workers: int):
+    """Refuse settings whose guarantees only hold inside a single process.
+
+    Stateless captchas remember redeemed tokens per worker, so with several
+    workers one token could be redeemed once in each of them.
+    """
+    if workers > 1 and settings.CAPTCHA_STATELESS:
+        raise RuntimeError(
+            f"CAPTCHA_STATELESS=true allows a captcha to be replayed once per worker "
+            f"and {workers} workers are configured; set SERVER_WORKERS=1 or CAPTCHA_STATELESS=false"
+        )
+
+
+def reset_after_fork():
+    """Drop state inherited from a preloading master.
+
+    Pooled connections and the logging listener thread can't be shared across
+    a fork; each worker starts with empty pools (without closing the parent's
+    sockets) and its own log queue.
+    """
+    from app.core.database import async_engine, engine
+    from app.core.logging_config import configure_logging
+    from app.core.replicas import replica_router
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    for replica in replica_router.replicas:
+        replica.engine.sync_engine.dispose(close=False)
+    configure_logging(settings)
+
+
+class Server(BaseApplication):
+    """Run gunicorn in-process with gunicorn.conf.py, e.g. from ``python -m app.main``"""
+
+    def __init__(self, app: Union[str, Any] = "app.main:app"):
+        self.application = app
+        super().__init__()
+
+    def load_config(self):
+        for key, value in runpy.run_path(GUNICORN_CONF).items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        if isinstance(self.application, str):
+            from gunicorn.util import import_app
+            return import_app(self.application)
+        return self.application
+
+
+def run(app: Union[str, Any] = "app.main:app"):
+    """Production entrypoint: multi-worker gunicorn with uvicorn workers"""
+    Server(app).run()
@@ -1,17 +1,57 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.logging_config import configure_logging
+from app.core.database import async_engine, engine
+from app.core.migrations import SchemaOutOfDateError, check_schema_revision
+from app.core.replicas import replica_lag_checker, replica_router
 from app.api.v1.auth import router as auth_router
+from app.api.v1.metrics import router as metrics_router
+from app.services.captcha_service import captcha_pool, captcha_reaper
+from app.services.token_service import refresh_token_flusher
+from app.utils.security import jwt_key_ring, password_hashing_pool
+
+# Route logging through the non-blocking queue before anything logs
+configure_logging(settings)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop per-worker background services"""
+    # Schema changes are applied by 'alembic upgrade head' at deploy time, never by workers
+    try:
+        await check_schema_revision(async_engine)
+    except SchemaOutOfDateError:
+        await async_engine.dispose()
+        raise
+    captcha_pool.start()
+    captcha_reaper.start()
+    refresh_token_flusher.start()
+    if replica_lag_checker.enabled:
+        # Replicas join the rotation once their lag is known
+        await run_in_threadpool(replica_lag_checker.run_once)
+        replica_lag_checker.start()
+    yield
+    replica_lag_checker.stop()
+    refresh_token_flusher.stop()
+    refresh_token_flusher.run_once()
+    captcha_reaper.stop()
+    captcha_pool.stop()
+    password_hashing_pool.shutdown()
+    await replica_router.dispose()
+    await async_engine.dispose()
+    engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     description="API with Authentication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -25,6 +65,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(auth_router, prefix="/v1", tags=["Authentication"])
+app.include_router(metrics_router, prefix="/v1", tags=["Metrics"])
 
 
 @app.get("/")
@@ -39,6 +80,17 @@ async def root():
         "message": "API -running with updated password generation logic "
     }
 
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """Public keys for verifying access tokens without calling this API"""
+    return JSONResponse(
+        content=jwt_key_ring.jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"}
+    )
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multi-worker production server; use `uvicorn app.main:app --reload` for development
+    from app.core.server import run
+    run(app)
@@ -1,11 +1,20 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal, text
 from app.core.database import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Filters on the users list; (column, id) keeps the id-ordered page an
+        # index walk and the partial predicate matches the default is_deleted = false
+        Index("ix_users_role_id", "role", "id", postgresql_where=text("is_deleted = false"), sqlite_where=text("is_deleted = 0")),
+        Index("ix_users_org_type_id", "org_type", "id", postgresql_where=text("is_deleted = false"), sqlite_where=text("is_deleted = 0")),
+        Index("ix_users_status_id", "status", "id", postgresql_where=text("is_deleted = false"), sqlite_where=text("is_deleted = 0")),
+        Index("ix_users_is_test_user_id", "is_test_user", "id", postgresql_where=text("is_deleted = false"), sqlite_where=text("is_deleted = 0")),
+        Index("ix_users_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(100), nullable=False)
@@ -56,6 +65,25 @@ class User(Base):
     associated_managers = relationship("AssociatedManager", back_populates="user")
 
 
+# Lower-cased names and emails for the users list search. The trigram index is
+# built on exactly this expression, so LIKE '%term%' against it can use it
+_EMPTY, _SPACE = literal("", literal_execute=True), literal(" ", literal_execute=True)
+USER_SEARCH_TEXT = func.lower(
+    func.coalesce(User.first_name, _EMPTY) + _SPACE + func.coalesce(User.last_name, _EMPTY) + _SPACE
+    + User.email + _SPACE + func.coalesce(User.email_id, _EMPTY)
+)
+Index(
+    "ix_users_search_trgm", USER_SEARCH_TEXT.label("search_text"),
+    postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+
+# When a user last changed. The users list ETag reads max() of it, which the
+# expression index answers from its last entry instead of scanning users
+USER_CHANGED_AT = func.coalesce(User.updated_at, User.created_at)
+Index("ix_users_changed_at", USER_CHANGED_AT)
+
+
 class Organization(Base):
     __tablename__ = "organizations"
     
@@ -157,11 +185,28 @@ class AssociatedManager(Base):
 
 class Captcha(Base):
     __tablename__ = "captchas"
+    __table_args__ = (
+        # Support the reaper's chunked deletes of expired and used captchas
+        Index("ix_captchas_expires_at", "expires_at"),
+        Index("ix_captchas_used", "id", postgresql_where=text("is_used")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     captcha_id = Column(String(50), unique=True, index=True, nullable=False)
     captcha_text = Column(String(20), nullable=False)
-    image_data = Column(Text, nullable=False)  # Base64 encoded image
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=False)
     is_used = Column(Boolean, default=False)
+
+
+class RefreshTokenFamily(Base):
+    __tablename__ = "refresh_token_families"
+
+    family_id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    min_generation = Column(Integer, nullable=False, default=0)  # Older generations are replays
+    revoked = Column(Boolean, nullable=False, default=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    secret_hash = Column(String(64), nullable=False)  # SHA-256 of the secret in every refresh token of the family
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
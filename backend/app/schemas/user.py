@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -29,6 +29,21 @@ class SigninResponse(BaseModel):
     user_type: List[str]
     event_name: Optional[str] = None
     is_external: bool
+    refresh_token: Optional[str] = None
+
+
+# Refresh token schemas
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
+class RefreshTokenResponse(BaseModel):
+    token: str
+    refresh_token: str
+
+
+class SignoutResponse(BaseModel):
+    message: str
 
 
 # Signup schemas
@@ -63,7 +78,8 @@ class SignupResponse(BaseModel):
 # Captcha schemas
 class CaptchaData(BaseModel):
     captcha_id: str
-    image: str
+    image: Optional[str] = None  # Base64 image, omitted in url mode
+    image_url: Optional[str] = None
 
 
 class CaptchaResponse(BaseModel):
@@ -198,8 +214,23 @@ class UserProfileResponse(BaseModel):
         from_attributes = True
 
 
+class UsersFilter(BaseModel):
+    """Server-side filters for the users list; hashable so it can key the count cache"""
+    model_config = ConfigDict(frozen=True)
+
+    role: Optional[str] = None
+    org_type: Optional[str] = None
+    status: Optional[str] = None
+    is_test_user: Optional[bool] = None
+    created_from: Optional[datetime] = None  # Inclusive
+    created_to: Optional[datetime] = None  # Exclusive
+    search: Optional[str] = None  # Case-insensitive substring of name, email or email_id
+
+
 class UsersListResponse(BaseModel):
     users: List[UserProfileResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # None with count=none
+    count_mode: str = "exact"  # How total was computed: exact, estimate, cached or none
+    page: Optional[int] = None  # Offset pagination only
     per_page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
@@ -1,39 +1,53 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User, Organization
 from app.schemas.user import SigninRequest, SignupRequest, SigninResponse, UserInfo
-from app.utils.security import verify_password, get_password_hash, create_access_token, generate_simple_password
+from app.utils.security import (
+    verify_password_async, get_password_hash_async, password_needs_rehash,
+    create_access_token, generate_simple_password
+)
 import secrets
 import string
 from app.services.captcha_service import verify_captcha
+from app.services.token_service import issue_refresh_token
 from fastapi import HTTPException, status
 from datetime import datetime
+import logging
 
 
-def authenticate_user(db: Session, signin_request: SigninRequest) -> SigninResponse:
+logger = logging.getLogger(__name__)
+
+
+async def authenticate_user(db: AsyncSession, signin_request: SigninRequest) -> SigninResponse:
     """Authenticate user with captcha verification"""
     
     # First verify captcha
-    if not verify_captcha(db, signin_request.captcha_id, signin_request.captcha_text):
+    if not await verify_captcha(db, signin_request.captcha_id, signin_request.captcha_text):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid captcha"
         )
     
     # Find user by email
-    user = db.query(User).filter(User.email == signin_request.email).first()
+    user = await get_user_by_email(db, signin_request.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    # Verify password (simple verification, no length validation needed)
-    if not verify_password(signin_request.password, user.password_hash):
+    # Verify password on the hashing pool so bcrypt never blocks the event loop
+    if not await verify_password_async(signin_request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Transparently upgrade legacy SHA-256 hashes now that we know the password
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash_async(signin_request.password)
+        await db.commit()
+    
     # Create access token
     token_data = {
         "sub": str(user.id),
@@ -41,6 +55,7 @@ def authenticate_user(db: Session, signin_request: SigninRequest) -> SigninRespo
         "role": user.role
     }
     access_token = create_access_token(data=token_data)
+    refresh_token = await issue_refresh_token(db, token_data)
     
     # Create user info
     user_info = UserInfo(
@@ -64,17 +79,18 @@ def authenticate_user(db: Session, signin_request: SigninRequest) -> SigninRespo
         message=message,
         user_type=user.user_type or [],
         event_name=None,
-        is_external=user.is_external
+        is_external=user.is_external,
+        refresh_token=refresh_token
     )
     
     return response
 
 
-def create_user(db: Session, signup_request: SignupRequest) -> dict:
+async def create_user(db: AsyncSession, signup_request: SignupRequest) -> dict:
     """Create a new user with complete profile"""
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == signup_request.email_id).first()
+    existing_user = await get_user_by_email(db, signup_request.email_id)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -82,16 +98,11 @@ def create_user(db: Session, signup_request: SignupRequest) -> dict:
         )
     
     # Use provided password or generate default
-    print(f"[DEBUG] Starting password generation for user: {signup_request.email_id}")
     if signup_request.password:
         initial_password = signup_request.password
-        print(f"[DEBUG] Using provided custom password: '{initial_password}'")
     else:
         initial_password = generate_simple_password(signup_request.email_id)
-        print(f"[DEBUG] Generated password: '{initial_password}'")
-    print(f"[DEBUG] About to hash password: '{initial_password}'")
-    password_hash = get_password_hash(initial_password)
-    print(f"[DEBUG] Password hashed successfully")
+    password_hash = await get_password_hash_async(initial_password)
     
     user = User(
         first_name=signup_request.first_name,
@@ -118,8 +129,8 @@ def create_user(db: Session, signup_request: SignupRequest) -> dict:
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Create organization record for complete profile
     organization = Organization(
@@ -137,7 +148,13 @@ def create_user(db: Session, signup_request: SignupRequest) -> dict:
     )
     
     db.add(organization)
-    db.commit()
+    await db.commit()
+    
+    logger.info("user.created", extra={
+        "user_id": user.id,
+        "email": user.email,
+        "custom_password": bool(signup_request.password)
+    })
     
     return {
         "message": f"User created successfully. Your initial password is: {initial_password}. Please login and change it immediately.",
@@ -145,11 +162,14 @@ def create_user(db: Session, signup_request: SignupRequest) -> dict:
     }
 
 
-def get_user_by_email(db: Session, email: str) -> User:
+async def get_user_by_email(db: AsyncSession, email: str) -> User:
     """Get user by email"""
-    return db.query(User).filter(User.email == email).first()
+    # Lambda statements are built and cache-keyed once; email becomes a bound parameter
+    stmt = lambda_stmt(lambda: select(User).where(User.email == email))
+    return (await db.execute(stmt)).scalars().first()
 
 
-def get_user_by_id(db: Session, user_id: int) -> User:
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
     """Get user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    stmt = lambda_stmt(lambda: select(User).where(User.id == user_id))
+    return (await db.execute(stmt)).scalars().first()
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+
+class CaptchaPool:
+    """Bounded pool of pre-rendered captchas refilled by a background thread.
+
+    The refill worker tops the pool up to ``high_watermark`` whenever it drops
+    below ``low_watermark``, so request handlers only ever pop a ready item.
+    """
+
+    def __init__(
+        self,
+        render_batch: Callable[[int], List[Tuple[str, bytes]]],
+        high_watermark: int,
+        low_watermark: int,
+        batch_size: int = 16,
+    ):
+        self._render_batch = render_batch
+        self.batch_size = max(batch_size, 1)
+        self.high_watermark = max(high_watermark, 0)
+        self.low_watermark = min(max(low_watermark, 0), self.high_watermark)
+        self._items: Deque[Tuple[str, bytes]] = deque(maxlen=self.high_watermark or None)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._rendered = 0
+        self._refills = 0
+        self._refill_seconds_total = 0.0
+        self._last_refill_seconds = 0.0
+        self._max_refill_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.high_watermark > 0
+
+    def start(self):
+        """Start the refill worker and request an initial fill"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="captcha-pool", daemon=True)
+        self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the refill worker"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def pop(self) -> Optional[Tuple[str, bytes]]:
+        """Take a pre-rendered captcha, or None when the pool is empty"""
+        with self._lock:
+            item = self._items.popleft() if self._items else None
+            if item is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            size = len(self._items)
+
+        if self.enabled and size < self.low_watermark:
+            self._wakeup.set()
+        return item
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            if len(self._items) < self.low_watermark or not self._items:
+                self._refill()
+
+    def _refill(self):
+        started = time.perf_counter()
+        rendered = 0
+        while not self._stop.is_set() and len(self._items) < self.high_watermark:
+            count = min(self.batch_size, self.high_watermark - len(self._items))
+            items = self._render_batch(count)
+            with self._lock:
+                self._items.extend(items)
+            rendered += len(items)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._rendered += rendered
+            self._refills += 1
+            self._refill_seconds_total += elapsed
+            self._last_refill_seconds = elapsed
+            self._max_refill_seconds = max(self._max_refill_seconds, elapsed)
+
+    def stats(self) -> dict:
+        """Snapshot of pool size and hit/miss/refill counters"""
+        with self._lock:
+            requests = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._items),
+                "high_watermark": self.high_watermark,
+                "low_watermark": self.low_watermark,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / requests, 4) if requests else None,
+                "rendered": self._rendered,
+                "refills": self._refills,
+                "refill_seconds_total": round(self._refill_seconds_total, 6),
+                "last_refill_seconds": round(self._last_refill_seconds, 6),
+                "max_refill_seconds": round(self._max_refill_seconds, 6),
+            }
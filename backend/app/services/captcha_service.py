@@ -1,115 +1,243 @@
-import random
 import string
 import base64
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+import hashlib
+import hmac
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, func, lambda_stmt, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.database import SessionLocal
 from app.models.user import Captcha
 from app.core.config import settings
+from app.services.captcha_pool import CaptchaPool
+from app.services.captcha_renderer import CaptchaRenderer
+from app.utils.periodic import PeriodicWorker
+from app.utils.ttl_cache import TTLCache
+from app.utils.ttl_set import TTLSet
 
 
 def generate_captcha_text(length: int = 6) -> str:
     """Generate random captcha text"""
     characters = string.ascii_uppercase + string.digits
-    return ''.join(random.choice(characters) for _ in range(length))
+    return ''.join(secrets.choice(characters) for _ in range(length))
 
 
-def generate_captcha_image(text: str) -> str:
-    """Generate captcha image and return as base64 string"""
-    # Create image
-    width, height = 200, 80
-    image = Image.new('RGB', (width, height), color='white')
-    draw = ImageDraw.Draw(image)
-    
-    # Try to use a font, fallback to default if not available
+# Media types for the image formats captchas can be rendered in
+CAPTCHA_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+
+# Fonts and glyph atlas are loaded once per process
+captcha_renderer = CaptchaRenderer(image_format=settings.CAPTCHA_IMAGE_FORMAT)
+
+
+def generate_captcha_image(text: str) -> bytes:
+    """Generate captcha image and return the encoded image bytes"""
+    return captcha_renderer.render(text)
+
+
+def render_captchas(count: int) -> List[Tuple[str, bytes]]:
+    """Render a batch of fresh captchas as (text, image bytes) pairs"""
+    texts = [generate_captcha_text() for _ in range(count)]
+    return list(zip(texts, captcha_renderer.render_batch(texts)))
+
+
+def render_captcha() -> Tuple[str, bytes]:
+    """Render a fresh captcha, returning (text, image bytes)"""
+    return render_captchas(1)[0]
+
+
+# Pre-rendered captchas so the request path never draws with PIL
+captcha_pool = CaptchaPool(
+    render_captchas,
+    high_watermark=settings.CAPTCHA_POOL_SIZE,
+    low_watermark=settings.CAPTCHA_POOL_LOW_WATERMARK,
+    batch_size=settings.CAPTCHA_RENDER_BATCH_SIZE
+)
+
+
+# Rendered images served by GET /v1/captcha/{id}.{format} until they expire
+captcha_images = TTLCache(max_entries=settings.CAPTCHA_IMAGE_CACHE_MAX_ENTRIES)
+
+# Tokens already redeemed in stateless mode, kept until they expire
+used_captcha_tokens = TTLSet(max_entries=settings.CAPTCHA_USED_SET_MAX_ENTRIES)
+
+
+def _captcha_signing_key() -> bytes:
+    """Derive the captcha HMAC key so it is never the raw JWT secret"""
+    secret = settings.CAPTCHA_SECRET_KEY or settings.SECRET_KEY
+    return hashlib.sha256(b"captcha-token:" + secret.encode()).digest()
+
+
+def _captcha_mac(nonce: str, expires: int, captcha_text: str) -> str:
+    message = f"{nonce}.{expires}.{captcha_text.upper()}".encode()
+    return hmac.new(_captcha_signing_key(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def create_captcha_token(captcha_text: str) -> str:
+    """Create a signed, expiring captcha token bound to the answer.
+
+    The token is ``<nonce>.<expires>.<mac>`` where the MAC covers the nonce,
+    the expiry and the answer, so the answer never leaves the server in a
+    form that can be brute-forced offline.
+    """
+    nonce = secrets.token_urlsafe(12)
+    expires = int(time.time()) + settings.CAPTCHA_EXPIRE_MINUTES * 60
+    return f"{nonce}.{expires}.{_captcha_mac(nonce, expires, captcha_text)}"
+
+
+def verify_captcha_token(token: str, captcha_text: str) -> bool:
+    """Verify a stateless captcha token and mark it as used"""
     try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 36)
-    except:
-        font = ImageFont.load_default()
-    
-    # Draw text
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    x = (width - text_width) // 2
-    y = (height - text_height) // 2
-    
-    # Add some noise to make it harder to read
-    for _ in range(100):
-        x_noise = random.randint(0, width)
-        y_noise = random.randint(0, height)
-        draw.point((x_noise, y_noise), fill=(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
-    
-    # Draw the text
-    draw.text((x, y), text, fill='black', font=font)
-    
-    # Add some lines to make it harder to read
-    for _ in range(5):
-        start_x = random.randint(0, width)
-        start_y = random.randint(0, height)
-        end_x = random.randint(0, width)
-        end_y = random.randint(0, height)
-        draw.line([(start_x, start_y), (end_x, end_y)], fill=(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)), width=2)
-    
-    # Convert to base64
-    buffer = BytesIO()
-    image.save(buffer, format='PNG')
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-    return img_str
-
-
-def create_captcha(db: Session) -> dict:
-    """Create a new captcha"""
-    captcha_text = generate_captcha_text()
-    captcha_id = ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(10))
-    image_data = generate_captcha_image(captcha_text)
-    
-    # Set expiration time
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.CAPTCHA_EXPIRE_MINUTES)
-    
-    # Save to database
-    captcha = Captcha(
-        captcha_id=captcha_id,
-        captcha_text=captcha_text,
-        image_data=image_data,
-        expires_at=expires_at
-    )
-    
-    db.add(captcha)
-    db.commit()
-    db.refresh(captcha)
-    
+        nonce, expires_str, mac = token.split(".")
+        expires = int(expires_str)
+    except ValueError:
+        return False
+
+    if expires <= time.time():
+        return False
+
+    if not hmac.compare_digest(mac, _captcha_mac(nonce, expires, captcha_text)):
+        return False
+
+    # Reject replays of a token that has already been redeemed
+    return used_captcha_tokens.add(nonce, expires)
+
+
+async def create_captcha(db: AsyncSession, inline_image: bool = True) -> dict:
+    """Create a new captcha.
+
+    With ``inline_image`` the image is returned base64-encoded in the JSON
+    body; otherwise it is kept for ``get_captcha_image`` and left out.
+    """
+    # Fall back to rendering on a worker thread only when the pool is drained
+    pooled = captcha_pool.pop()
+    captcha_text, image_bytes = pooled if pooled else await run_in_threadpool(render_captcha)
+
+    if settings.CAPTCHA_STATELESS:
+        captcha_id = create_captcha_token(captcha_text)
+    else:
+        captcha_id = secrets.token_urlsafe(16)
+
+        # Set expiration time
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.CAPTCHA_EXPIRE_MINUTES)
+
+        # Save to database
+        captcha = Captcha(
+            captcha_id=captcha_id,
+            captcha_text=captcha_text,
+            expires_at=expires_at
+        )
+
+        db.add(captcha)
+        await db.commit()
+
+    if inline_image:
+        return {
+            "captcha_id": captcha_id,
+            "image": base64.b64encode(image_bytes).decode()
+        }
+
+    captcha_images.set(captcha_id, image_bytes, time.time() + settings.CAPTCHA_EXPIRE_MINUTES * 60)
     return {
         "captcha_id": captcha_id,
-        "image": image_data
+        "image": None
     }
 
 
-def verify_captcha(db: Session, captcha_id: str, captcha_text: str) -> bool:
-    """Verify captcha"""
-    captcha = db.query(Captcha).filter(
-        Captcha.captcha_id == captcha_id,
-        Captcha.is_used == False,
-        Captcha.expires_at > datetime.now(timezone.utc)
-    ).first()
-    
+async def get_captcha_image(db: AsyncSession, captcha_id: str) -> Optional[bytes]:
+    """Get the encoded image for an unused, unexpired captcha"""
+    image_bytes = captcha_images.get(captcha_id)
+    if image_bytes is not None or settings.CAPTCHA_STATELESS:
+        return image_bytes
+
+    # Another worker issued this captcha; re-render it from the stored text
+    captcha = (await db.execute(
+        select(Captcha).where(
+            Captcha.captcha_id == captcha_id,
+            Captcha.is_used == False,
+            Captcha.expires_at > datetime.now(timezone.utc)
+        )
+    )).scalars().first()
     if not captcha:
-        return False
-    
-    if captcha.captcha_text.upper() != captcha_text.upper():
-        return False
-    
-    # Mark as used
-    captcha.is_used = True
-    db.commit()
+        return None
+
+    image_bytes = await run_in_threadpool(generate_captcha_image, captcha.captcha_text)
+    captcha_images.set(captcha_id, image_bytes, captcha.expires_at.timestamp())
+    return image_bytes
+
+
+async def verify_captcha(db: AsyncSession, captcha_id: str, captcha_text: str) -> bool:
+    """Verify captcha"""
+    if settings.CAPTCHA_STATELESS:
+        return verify_captcha_token(captcha_id, captcha_text)
+
+    # Check and consume in one conditional UPDATE so concurrent signins
+    # cannot both redeem the same captcha. Built once as a lambda statement;
+    # only the bound parameters change per call
+    answer = captcha_text.upper()
+    stmt = lambda_stmt(lambda: (
+        update(Captcha)
+        .where(
+            Captcha.captcha_id == captcha_id,
+            Captcha.is_used == False,
+            Captcha.expires_at > func.now(),
+            func.upper(Captcha.captcha_text) == answer
+        )
+        .values(is_used=True)
+        .returning(Captcha.id)
+    ))
+    consumed = (await db.execute(stmt, execution_options={"synchronize_session": False})).first()
+    await db.commit()
     
-    return True
+    return consumed is not None
+
+
+def cleanup_expired_captchas(db: Session, batch_size: Optional[int] = None) -> dict:
+    """Delete expired and used captchas in bounded set-based chunks"""
+    batch_size = batch_size or settings.CAPTCHA_REAPER_BATCH_SIZE
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    removed = {}
+
+    # One pass per condition so each can walk its own index
+    for label, condition in (
+        ("expired_removed", Captcha.expires_at < now),
+        ("used_removed", Captcha.is_used == True)
+    ):
+        removed[label] = 0
+        while True:
+            chunk = select(Captcha.id).where(condition).limit(batch_size).scalar_subquery()
+            result = db.execute(
+                delete(Captcha).where(Captcha.id.in_(chunk)).execution_options(synchronize_session=False)
+            )
+            db.commit()
+            removed[label] += result.rowcount
+            if result.rowcount < batch_size:
+                break
+
+    return {
+        "rows_removed": removed["expired_removed"] + removed["used_removed"],
+        **removed,
+        "seconds": round(time.perf_counter() - started, 6)
+    }
+
+
+def reap_captchas() -> dict:
+    """Run one reaper pass on its own session"""
+    db = SessionLocal()
+    try:
+        return cleanup_expired_captchas(db)
+    finally:
+        db.close()
 
 
-def cleanup_expired_captchas(db: Session):
-    """Clean up expired captchas"""
-    expired_captchas = db.query(Captcha).filter(Captcha.expires_at < datetime.utcnow()).all()
-    for captcha in expired_captchas:
-        db.delete(captcha)
-    db.commit()
+# Keeps the captchas table small on systems that issue one per login page view
+captcha_reaper = PeriodicWorker(
+    "captcha-reaper",
+    settings.CAPTCHA_REAPER_INTERVAL_SECONDS,
+    reap_captchas
+)
@@ -0,0 +1,321 @@
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import delete, func, lambda_stmt, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import RefreshTokenFamily, User
+from app.utils.periodic import PeriodicWorker
+from app.utils.security import create_access_token
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FamilyState:
+    user_id: int
+    min_generation: int
+    revoked: bool
+    expires_at: datetime
+    secret_hash: str
+
+
+def _hash_secret(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+class RefreshTokenStore:
+    """In-memory refresh token family state with periodic persistence.
+
+    Each signin starts a token family with a random secret; only its SHA-256
+    is kept. Every refresh presents the secret and generation ``g`` and is
+    only accepted while ``g >= min_generation``; it then bumps
+    ``min_generation`` to ``g + 1``. Presenting an older generation means a
+    rotated token was replayed, so the whole family is revoked. A presented
+    secret that does not match is rejected without touching the family.
+
+    New families and revocations (signout, detected replays) are written
+    through to the database, so no worker loses or lags behind them; the
+    refresh path re-reads ``revoked`` with the user row it already loads.
+    Generation bumps are applied in memory and flushed periodically, merged
+    with ``GREATEST(min_generation)`` so concurrent workers converge.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, FamilyState] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._last_sync: Optional[datetime] = None
+
+    async def create(self, db: AsyncSession, user_id: int) -> Tuple[str, str]:
+        """Start a new family, persist it immediately and return its id and secret"""
+        family_id = secrets.token_hex(16)
+        secret = secrets.token_urlsafe(32)
+        state = FamilyState(
+            user_id=user_id,
+            min_generation=0,
+            revoked=False,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            secret_hash=_hash_secret(secret)
+        )
+        db.add(RefreshTokenFamily(
+            family_id=family_id,
+            user_id=user_id,
+            min_generation=0,
+            revoked=False,
+            expires_at=state.expires_at,
+            secret_hash=state.secret_hash
+        ))
+        await db.commit()
+        with self._lock:
+            self._families[family_id] = state
+        return family_id, secret
+
+    async def _get(self, db: AsyncSession, family_id: str) -> Optional[FamilyState]:
+        state = self._families.get(family_id)
+        if state is not None:
+            return state
+
+        # Issued by another worker since our last sync
+        row = await db.get(RefreshTokenFamily, family_id)
+        if row is None:
+            return None
+        state = FamilyState(row.user_id, row.min_generation, row.revoked, row.expires_at, row.secret_hash)
+        with self._lock:
+            return self._families.setdefault(family_id, state)
+
+    async def _authenticate(self, db: AsyncSession, family_id: str, secret: str) -> Optional[FamilyState]:
+        state = await self._get(db, family_id)
+        if state is None or not hmac.compare_digest(state.secret_hash, _hash_secret(secret)):
+            return None
+        return state
+
+    async def rotate(self, db: AsyncSession, family_id: str, generation: int, secret: str) -> Optional[FamilyState]:
+        """Consume ``generation`` and return the family state, or None if rejected"""
+        state = await self._authenticate(db, family_id, secret)
+        if state is None:
+            return None
+
+        with self._lock:
+            if state.revoked or state.expires_at <= datetime.now(timezone.utc):
+                return None
+            if generation >= state.min_generation:
+                state.min_generation = generation + 1
+                self._dirty.add(family_id)
+                return state
+            state.revoked = True
+
+        logger.warning("refresh_token.reuse_detected", extra={"family_id": family_id, "user_id": state.user_id})
+        await self._persist_revocation(db, family_id)
+        return None
+
+    async def revoke(self, db: AsyncSession, family_id: str, secret: str) -> bool:
+        """Revoke every token in a family"""
+        state = await self._authenticate(db, family_id, secret)
+        if state is None:
+            return False
+        with self._lock:
+            state.revoked = True
+        await self._persist_revocation(db, family_id)
+        return True
+
+    @staticmethod
+    async def _persist_revocation(db: AsyncSession, family_id: str):
+        await db.execute(
+            update(RefreshTokenFamily)
+            .where(RefreshTokenFamily.family_id == family_id)
+            .values(revoked=True, updated_at=func.now())
+        )
+        await db.commit()
+
+    def mark_revoked(self, family_id: str):
+        """Apply a revocation another worker already wrote to the database"""
+        with self._lock:
+            state = self._families.get(family_id)
+            if state is not None:
+                state.revoked = True
+
+    def flush(self, db: Session) -> dict:
+        """Persist dirty families and pull changes made by other workers"""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            dirty = {family_id: self._families[family_id] for family_id in self._dirty if family_id in self._families}
+            self._dirty.clear()
+
+        if dirty:
+            stmt = insert(RefreshTokenFamily).values([
+                {
+                    "family_id": family_id,
+                    "user_id": state.user_id,
+                    "min_generation": state.min_generation,
+                    "revoked": state.revoked,
+                    "expires_at": state.expires_at,
+                    "secret_hash": state.secret_hash
+                }
+                for family_id, state in dirty.items()
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[RefreshTokenFamily.family_id],
+                set_={
+                    "min_generation": func.greatest(RefreshTokenFamily.min_generation, stmt.excluded.min_generation),
+                    "revoked": RefreshTokenFamily.revoked | stmt.excluded.revoked,
+                    "updated_at": func.now()
+                }
+            ))
+            db.commit()
+
+        # Merge families touched elsewhere since the previous sync. The first
+        # sync has no watermark, so it only looks up the families held here
+        query = select(RefreshTokenFamily).where(RefreshTokenFamily.expires_at > now)
+        if self._last_sync is not None:
+            queries = [query.where(RefreshTokenFamily.updated_at >= self._last_sync - timedelta(seconds=5))]
+        else:
+            with self._lock:
+                held = list(self._families)
+            batch_size = settings.REFRESH_TOKEN_REAPER_BATCH_SIZE
+            queries = [
+                query.where(RefreshTokenFamily.family_id.in_(held[start:start + batch_size]))
+                for start in range(0, len(held), batch_size)
+            ]
+        refreshed = 0
+        for chunk in queries:
+            rows = db.execute(chunk).scalars().all()
+            with self._lock:
+                for row in rows:
+                    state = self._families.get(row.family_id)
+                    if state is None:
+                        continue
+                    state.min_generation = max(state.min_generation, row.min_generation)
+                    state.revoked = state.revoked or row.revoked
+                    refreshed += 1
+        db.commit()
+
+        deleted = self._delete_expired(db, now)
+
+        with self._lock:
+            expired = [family_id for family_id, state in self._families.items() if state.expires_at <= now]
+            for family_id in expired:
+                del self._families[family_id]
+            self._last_sync = now
+
+        return {"flushed": len(dirty), "merged": refreshed, "expired": len(expired), "deleted": deleted}
+
+    @staticmethod
+    def _delete_expired(db: Session, now: datetime) -> int:
+        """Delete expired families in bounded chunks; every worker may run this concurrently"""
+        batch_size = settings.REFRESH_TOKEN_REAPER_BATCH_SIZE
+        deleted = 0
+        while True:
+            chunk = (
+                select(RefreshTokenFamily.family_id)
+                .where(RefreshTokenFamily.expires_at < now)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = db.execute(
+                delete(RefreshTokenFamily)
+                .where(RefreshTokenFamily.family_id.in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "families": len(self._families),
+                "dirty": len(self._dirty),
+                "revoked": sum(1 for state in self._families.values() if state.revoked),
+            }
+
+
+refresh_token_store = RefreshTokenStore()
+
+
+def flush_refresh_tokens() -> dict:
+    """Run one persistence pass on its own session"""
+    db = SessionLocal()
+    try:
+        return refresh_token_store.flush(db)
+    finally:
+        db.close()
+
+
+refresh_token_flusher = PeriodicWorker(
+    "refresh-token-flush",
+    settings.REFRESH_TOKEN_FLUSH_SECONDS,
+    flush_refresh_tokens
+)
+
+
+def _encode_refresh_token(family_id: str, generation: int, secret: str) -> str:
+    """Opaque ``family.generation.secret``; unlike a JWT it means nothing outside this service"""
+    return f"{family_id}.{generation}.{secret}"
+
+
+async def issue_refresh_token(db: AsyncSession, token_data: dict) -> str:
+    """Start a refresh token family for a fresh signin"""
+    family_id, secret = await refresh_token_store.create(db, int(token_data["sub"]))
+    return _encode_refresh_token(family_id, 0, secret)
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token"
+    )
+
+
+def _decode_refresh_token(refresh_token: str) -> Tuple[str, int, str]:
+    parts = refresh_token.split(".")
+    if len(parts) != 3 or not parts[1].isdigit():
+        raise _invalid_refresh_token()
+    family_id, generation, secret = parts
+    return family_id, int(generation), secret
+
+
+async def refresh_access_token(db: AsyncSession, refresh_token: str) -> dict:
+    """Exchange a refresh token for a new access token and rotated refresh token"""
+    family_id, generation, secret = _decode_refresh_token(refresh_token)
+    state = await refresh_token_store.rotate(db, family_id, generation, secret)
+    if state is None:
+        raise _invalid_refresh_token()
+
+    # Claims come from the user row, so role or email changes apply on refresh.
+    # The same read picks up a revocation written through by another worker
+    stmt = lambda_stmt(
+        lambda: select(User.id, User.email, User.role, RefreshTokenFamily.revoked)
+        .join(RefreshTokenFamily, RefreshTokenFamily.user_id == User.id)
+        .where(RefreshTokenFamily.family_id == family_id)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        raise _invalid_refresh_token()
+    if row.revoked:
+        refresh_token_store.mark_revoked(family_id)
+        raise _invalid_refresh_token()
+
+    token_data = {"sub": str(row.id), "email": row.email, "role": row.role}
+    return {
+        "token": create_access_token(data=token_data),
+        "refresh_token": _encode_refresh_token(family_id, generation + 1, secret)
+    }
+
+
+async def revoke_refresh_token(db: AsyncSession, refresh_token: str):
+    """Revoke the family a refresh token belongs to"""
+    family_id, _, secret = _decode_refresh_token(refresh_token)
+    if not await refresh_token_store.revoke(db, family_id, secret):
+        raise _invalid_refresh_token()
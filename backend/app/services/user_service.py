@@ -1,184 +1,426 @@
-from sqlalchemy.orm import Session, joinedload
-from app.models.user import User, Organization, SupervisorDetail, MouInfo, ReferenceDocument, AssociatedManager
-from app.schemas.user import UserProfileResponse, UsersListResponse, OrganizationResponse, SupervisorDetailResponse, MouInfoResponse, ReferenceDocumentResponse, AssociatedManagerResponse, OrgDetailsResponse, OrgAddress
+from sqlalchemy import event, func, lambda_stmt, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from app.core.config import settings
+from app.models.user import USER_CHANGED_AT, USER_SEARCH_TEXT, User, Organization, SupervisorDetail, MouInfo, ReferenceDocument, AssociatedManager
+from app.schemas.user import UserProfileResponse, UsersFilter
 from fastapi import HTTPException, status
-from typing import List, Optional
-from sqlalchemy import and_
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple
+import base64
+import binascii
+import csv
+import io
+import itertools
+import json
+import time
+from app.utils import fast_json
+from app.utils.ttl_cache import TTLCache
+from datetime import datetime
 
 
-def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
-    """Get user by ID with all related data"""
-    return db.query(User).options(
-        joinedload(User.org),
-        joinedload(User.supervisor_details),
-        joinedload(User.mou_info),
-        joinedload(User.reference_documents),
-        joinedload(User.associated_managers)
-    ).filter(User.id == user_id).first()
+# One-to-one relations are joined (one row per user); each collection is
+# loaded by its own "WHERE user_id IN (...)" query, so a page costs a fixed
+# four queries and LIMIT counts users instead of joined rows
+USER_PROFILE_LOADS = (
+    joinedload(User.org),
+    joinedload(User.mou_info),
+    selectinload(User.supervisor_details),
+    selectinload(User.reference_documents),
+    selectinload(User.associated_managers)
+)
 
+# Profile rows kept outside users; writing one is a change to the owning user
+PROFILE_RELATED_MODELS = (Organization, SupervisorDetail, MouInfo, ReferenceDocument, AssociatedManager)
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+CountMode = Literal["exact", "estimate", "cached", "none"]
+ExportFormat = Literal["ndjson", "csv"]
+
+# Exact user counts per filter, dropped whenever this worker commits a user change
+users_count_cache = TTLCache(max_entries=64)
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int, loads: Optional[tuple] = None) -> Optional[User]:
+    """Get user by ID with all related data, or only what ``loads`` selects"""
+    if loads is None:
+        stmt = lambda_stmt(lambda: select(User).options(*USER_PROFILE_LOADS).where(User.id == user_id))
+    else:
+        stmt = select(User).options(*loads).where(User.id == user_id)
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email with all related data"""
-    return db.query(User).options(
-        joinedload(User.org),
-        joinedload(User.supervisor_details),
-        joinedload(User.mou_info),
-        joinedload(User.reference_documents),
-        joinedload(User.associated_managers)
-    ).filter(User.email == email).first()
-
-
-def get_all_users(db: Session, skip: int = 0, limit: int = 100, include_deleted: bool = False) -> List[User]:
-    """Get all users with pagination and optional deleted users"""
-    query = db.query(User).options(
-        joinedload(User.org),
-        joinedload(User.supervisor_details),
-        joinedload(User.mou_info),
-        joinedload(User.reference_documents),
-        joinedload(User.associated_managers)
-    )
+    stmt = lambda_stmt(lambda: select(User).options(*USER_PROFILE_LOADS).where(User.email == email))
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+def encode_cursor(user_id: int) -> str:
+    """Opaque cursor pointing just past the given user"""
+    return base64.urlsafe_b64encode(json.dumps({"after": user_id}).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the user id a cursor points past"""
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["after"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        after = None
+    if not isinstance(after, int) or isinstance(after, bool):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return after
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards in user input, using / as the escape character"""
+    return term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def users_filter_clauses(include_deleted: bool = False, filters: Optional[UsersFilter] = None) -> list:
+    """WHERE clauses for the users list, shared by the page and count queries.
+
+    Each filter has a matching index (see the User model and migration 0002);
+    the search is a LIKE on USER_SEARCH_TEXT so the pg_trgm index applies.
+    """
+    clauses = [] if include_deleted else [User.is_deleted == False]
+    if filters is None:
+        return clauses
+    if filters.role is not None:
+        clauses.append(User.role == filters.role)
+    if filters.org_type is not None:
+        clauses.append(User.org_type == filters.org_type)
+    if filters.status is not None:
+        clauses.append(User.status == filters.status)
+    if filters.is_test_user is not None:
+        clauses.append(User.is_test_user == filters.is_test_user)
+    if filters.created_from is not None:
+        clauses.append(User.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        clauses.append(User.created_at < filters.created_to)
+    if filters.search:
+        clauses.append(USER_SEARCH_TEXT.like(f"%{escape_like(filters.search.lower())}%", escape="/"))
+    return clauses
+
+
+async def get_all_users(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    include_deleted: bool = False,
+    after_id: Optional[int] = None,
+    loads: tuple = USER_PROFILE_LOADS,
+    filters: Optional[UsersFilter] = None
+) -> Tuple[List[User], bool]:
+    """Get a page of users ordered by id, and whether more follow.
+
+    With ``after_id`` the page starts right after that user (keyset
+    pagination), so deep pages cost the same as the first; otherwise
+    ``skip`` rows are skipped as before.
+    """
+    query = select(User).options(*loads).where(*users_filter_clauses(include_deleted, filters))
     
-    if not include_deleted:
-        query = query.filter(User.is_deleted == False)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    else:
+        query = query.offset(skip)
     
-    return query.offset(skip).limit(limit).all()
+    # One extra row tells us whether there is a next page
+    result = await db.execute(query.order_by(User.id).limit(limit + 1))
+    users = list(result.scalars().all())
+    return users[:limit], len(users) > limit
 
 
-def get_users_count(db: Session, include_deleted: bool = False) -> int:
+async def get_users_count(db: AsyncSession, include_deleted: bool = False, filters: Optional[UsersFilter] = None) -> int:
     """Get total count of users"""
-    query = db.query(User)
-    if not include_deleted:
-        query = query.filter(User.is_deleted == False)
-    return query.count()
+    query = select(func.count()).select_from(User).where(*users_filter_clauses(include_deleted, filters))
+    return (await db.execute(query)).scalar_one()
 
 
-def convert_user_to_profile_response(user: User) -> UserProfileResponse:
-    """Convert User model to UserProfileResponse schema"""
-    
-    # Convert organization
-    org_response = None
-    if user.org:
-        org_details = OrgDetailsResponse(
-            ministry_name=user.org.ministry_name,
-            department_name=user.org.department_name
-        )
-        
-        org_address = None
-        if user.org.address:
-            org_address = OrgAddress(
-                address_type=user.org.address_type or "Primary",
-                address=user.org.address,
-                pincode=user.org.pincode or "",
-                state=user.org.state or "",
-                city=user.org.city or ""
-            )
-        
-        org_response = OrganizationResponse(
-            org_name=user.org.org_name,
-            org_type=user.org.org_type,
-            org_details=org_details,
-            org_website=user.org.org_website,
-            org_address=org_address
-        )
-    
-    # Convert supervisor details
-    supervisor_details = []
-    for supervisor in user.supervisor_details:
-        supervisor_details.append(SupervisorDetailResponse(
-            first_name=supervisor.first_name,
-            last_name=supervisor.last_name,
-            official_email=supervisor.official_email,
-            designation=supervisor.designation,
-            phone=supervisor.phone,
-            id_proof=supervisor.id_proof
-        ))
+async def estimate_users_count(db: AsyncSession, include_deleted: bool = False, filters: Optional[UsersFilter] = None) -> int:
+    """Row estimate from the Postgres planner's statistics, without scanning"""
+    if db.get_bind().dialect.name != "postgresql":
+        return await get_users_count(db, include_deleted, filters)
     
-    # Convert MOU info
-    mou_info = None
-    if user.mou_info:
-        mou_info = MouInfoResponse(
-            mou_format=user.mou_info.mou_format or "",
-            mou_custom_file_upload=user.mou_info.mou_custom_file_upload,
-            mou_custom_filename=user.mou_info.mou_custom_filename,
-            mou_status=user.mou_info.mou_status,
-            remarks=user.mou_info.remarks or "",
-            mou_requested_by=user.mou_info.mou_requested_by or "",
-            requested_on=user.mou_info.requested_on,
-            updated_on=user.mou_info.updated_on,
-            is_deleted=user.mou_info.is_deleted,
-            deleted_on=user.mou_info.deleted_on
+    query = select(User.id).where(*users_filter_clauses(include_deleted, filters))
+    # Filter values (e.g. the search term) stay bound parameters; the SQL goes
+    # to the driver as-is so nothing in user input is parsed as SQL or binds
+    compiled = query.compile(db.get_bind(), compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    connection = await db.connection()
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", params)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_users(
+    db: AsyncSession,
+    include_deleted: bool = False,
+    mode: CountMode = "exact",
+    filters: Optional[UsersFilter] = None
+) -> Optional[int]:
+    """Total for the users list in the requested count mode"""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        return await estimate_users_count(db, include_deleted, filters)
+    if mode == "cached":
+        key = (include_deleted, filters)
+        total = users_count_cache.get(key)
+        if total is None:
+            total = await get_users_count(db, include_deleted, filters)
+            users_count_cache.set(key, total, time.time() + settings.USERS_COUNT_CACHE_SECONDS)
+        return total
+    return await get_users_count(db, include_deleted, filters)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_user_changes(session, flush_context):
+    if any(isinstance(instance, User) for instance in itertools.chain(session.new, session.dirty, session.deleted)):
+        session.info["users_changed"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_profile_owners(session, flush_context):
+    """Bump users.updated_at when a user's related profile rows are written"""
+    owners = {
+        instance.user_id
+        for instance in itertools.chain(session.new, session.dirty, session.deleted)
+        if isinstance(instance, PROFILE_RELATED_MODELS) and instance.user_id is not None
+    }
+    if owners:
+        session.connection().execute(
+            update(User).where(User.id.in_(owners)).values(updated_at=func.now())
         )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users_count(session):
+    if session.info.pop("users_changed", False):
+        users_count_cache.clear()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_user_changes(session, previous_transaction):
+    session.info.pop("users_changed", None)
+
+
+def convert_org(org: Optional[Organization]) -> Optional[Dict[str, Any]]:
+    """Convert Organization model to OrganizationResponse data"""
+    if not org:
+        return None
     
-    # Convert reference documents
-    reference_documents = []
-    for doc in user.reference_documents:
-        reference_documents.append(ReferenceDocumentResponse(
-            file_name=doc.file_name,
-            blob_file_name=doc.blob_file_name,
-            role=doc.role,
-            uploaded_by=doc.uploaded_by,
-            uploaded_on=doc.uploaded_on
-        ))
+    org_address = None
+    if org.address:
+        org_address = {
+            "address_type": org.address_type or "Primary",
+            "address": org.address,
+            "pincode": org.pincode or "",
+            "state": org.state or "",
+            "city": org.city or ""
+        }
     
-    # Convert associated managers
-    associated_managers = []
-    for manager in user.associated_managers:
-        associated_managers.append(AssociatedManagerResponse(
-            application_name=manager.application_name,
-            manager_email=manager.manager_email
-        ))
+    return {
+        "org_name": org.org_name,
+        "org_type": org.org_type,
+        "org_details": {
+            "ministry_name": org.ministry_name,
+            "department_name": org.department_name
+        },
+        "org_website": org.org_website,
+        "org_address": org_address
+    }
+
+
+def convert_mou_info(mou: Optional[MouInfo]) -> Optional[Dict[str, Any]]:
+    """Convert MouInfo model to MouInfoResponse data"""
+    if not mou:
+        return None
     
-    return UserProfileResponse(
-        id=str(user.id),  # User ID as string
-        _id=str(user.id),  # Convert to string to match original API
-        first_name=user.first_name,
-        last_name=user.last_name,
-        designation=user.designation,
-        gender=user.gender,
-        email_id=user.email_id or user.email,  # Use email_id if available, fallback to email
-        personal_email=user.personal_email,
-        phone=user.phone,
-        org=org_response,
-        status=user.status or "Engaged",  # Default status
-        role=user.role,
-        user_type=user.user_type or [],  # Default empty array
-        product_access=user.product_access or [],  # Default empty array
-        mou_info=mou_info,
-        supervisor_details=supervisor_details,
-        additional_contacts=user.additional_contacts,
-        created_on=user.created_at,
-        updated_on=user.updated_at or user.created_at,
-        is_fresh=user.is_fresh,
-        is_profile_updated=user.is_profile_updated,
-        is_deleted=user.is_deleted,
-        deleted_on=user.deleted_on,
-        tnc_url=user.tnc_url,
-        tnc_accepted=user.tnc_accepted,
-        reference_documents=reference_documents,
-        last_login=user.last_login,
-        is_exisiting_user=user.is_exisiting_user,
-        is_test_user=user.is_test_user,
-        pending_req_count=user.pending_req_count or 0,  # Default 0
-        associated_manager=associated_managers,
-        is_parichay=user.is_parichay
-    )
+    return {
+        "mou_format": mou.mou_format or "",
+        "mou_custom_file_upload": mou.mou_custom_file_upload,
+        "mou_custom_filename": mou.mou_custom_filename,
+        "mou_status": mou.mou_status,
+        "remarks": mou.remarks or "",
+        "mou_requested_by": mou.mou_requested_by or "",
+        "requested_on": mou.requested_on,
+        "updated_on": mou.updated_on,
+        "is_deleted": mou.is_deleted,
+        "deleted_on": mou.deleted_on
+    }
 
 
-def get_user_profile_by_id(db: Session, user_id: int) -> UserProfileResponse:
-    """Get user profile by ID"""
-    user = get_user_by_id(db, user_id)
+def convert_supervisors(supervisors: List[SupervisorDetail]) -> List[Dict[str, Any]]:
+    """Convert SupervisorDetail models to SupervisorDetailResponse data"""
+    return [
+        {
+            "first_name": supervisor.first_name,
+            "last_name": supervisor.last_name,
+            "official_email": supervisor.official_email,
+            "designation": supervisor.designation,
+            "phone": supervisor.phone,
+            "id_proof": supervisor.id_proof
+        }
+        for supervisor in supervisors
+    ]
+
+
+def convert_reference_documents(documents: List[ReferenceDocument]) -> List[Dict[str, Any]]:
+    """Convert ReferenceDocument models to ReferenceDocumentResponse data"""
+    return [
+        {
+            "file_name": doc.file_name,
+            "blob_file_name": doc.blob_file_name,
+            "role": doc.role,
+            "uploaded_by": doc.uploaded_by,
+            "uploaded_on": doc.uploaded_on
+        }
+        for doc in documents
+    ]
+
+
+def convert_managers(managers: List[AssociatedManager]) -> List[Dict[str, Any]]:
+    """Convert AssociatedManager models to AssociatedManagerResponse data"""
+    return [
+        {
+            "application_name": manager.application_name,
+            "manager_email": manager.manager_email
+        }
+        for manager in managers
+    ]
+
+
+def _column(name: str):
+    return (getattr(User, name),), None, lambda user: getattr(user, name)
+
+
+# Every UserProfileResponse field: (User columns it reads, relationship loader
+# it needs, value getter). Sparse fieldsets load only what the requested fields name
+PROFILE_FIELDS: Dict[str, Tuple[tuple, Any, Callable[[User], Any]]] = {
+    "id": ((User.id,), None, lambda user: str(user.id)),  # User ID as string
+    "first_name": _column("first_name"),
+    "last_name": _column("last_name"),
+    "designation": _column("designation"),
+    "gender": _column("gender"),
+    # Use email_id if available, fallback to email
+    "email_id": ((User.email_id, User.email), None, lambda user: user.email_id or user.email),
+    "personal_email": _column("personal_email"),
+    "phone": _column("phone"),
+    "org": ((), joinedload(User.org), lambda user: convert_org(user.org)),
+    "status": ((User.status,), None, lambda user: user.status or "Engaged"),  # Default status
+    "role": _column("role"),
+    "user_type": ((User.user_type,), None, lambda user: user.user_type or []),  # Default empty array
+    "product_access": ((User.product_access,), None, lambda user: user.product_access or []),
+    "mou_info": ((), joinedload(User.mou_info), lambda user: convert_mou_info(user.mou_info)),
+    "supervisor_details": ((), selectinload(User.supervisor_details), lambda user: convert_supervisors(user.supervisor_details)),
+    "additional_contacts": _column("additional_contacts"),
+    "created_on": ((User.created_at,), None, lambda user: user.created_at),
+    "updated_on": ((User.updated_at, User.created_at), None, lambda user: user.updated_at or user.created_at),
+    "is_fresh": _column("is_fresh"),
+    "is_profile_updated": _column("is_profile_updated"),
+    "is_deleted": _column("is_deleted"),
+    "deleted_on": _column("deleted_on"),
+    "tnc_url": _column("tnc_url"),
+    "tnc_accepted": _column("tnc_accepted"),
+    "reference_documents": ((), selectinload(User.reference_documents), lambda user: convert_reference_documents(user.reference_documents)),
+    "last_login": _column("last_login"),
+    "is_exisiting_user": _column("is_exisiting_user"),
+    "is_test_user": _column("is_test_user"),
+    "pending_req_count": ((User.pending_req_count,), None, lambda user: user.pending_req_count or 0),  # Default 0
+    "associated_manager": ((), selectinload(User.associated_managers), lambda user: convert_managers(user.associated_managers)),
+    "is_parichay": _column("is_parichay"),
+}
+
+
+def parse_profile_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated ?fields= value; None means the full profile"""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in PROFILE_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        )
+    return requested
+
+
+def profile_loads(fields: List[str]) -> tuple:
+    """Loader options that fetch only the columns and relationships behind ``fields``"""
+    columns = {User.id}
+    loads = []
+    for field in fields:
+        field_columns, loader, _ = PROFILE_FIELDS[field]
+        columns.update(field_columns)
+        if loader is not None:
+            loads.append(loader)
+    return (load_only(*columns), *loads)
+
+
+def convert_user_to_profile_dict(user: User, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """UserProfileResponse data straight from the row, limited to ``fields`` when given.
+
+    Plain dicts, lists and datetimes only, ready for app.utils.fast_json;
+    nothing is validated on the way out.
+    """
+    if fields is None:
+        return {field: getter(user) for field, (_, _, getter) in PROFILE_FIELDS.items()}
+    return {field: PROFILE_FIELDS[field][2](user) for field in fields}
+
+
+def convert_user_to_profile_response(user: User) -> UserProfileResponse:
+    """Convert User model to a validated UserProfileResponse schema"""
+    return UserProfileResponse(**convert_user_to_profile_dict(user))
+
+
+async def get_user_profile_by_id(
+    db: AsyncSession,
+    user_id: int,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Get user profile data by ID, limited to ``fields`` when given"""
+    user = await get_user_by_id(db, user_id, profile_loads(fields) if fields else None)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    return convert_user_to_profile_response(user)
+    return convert_user_to_profile_dict(user, fields)
+
+
+async def get_user_version(db: AsyncSession, user_id: int) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+    """The user's (updated_at, created_at) for the profile ETag, or None if missing.
 
+    Writes to the related profile tables bump users.updated_at (see
+    _touch_profile_owners), so this pair changes with the whole profile.
+    """
+    stmt = lambda_stmt(lambda: select(User.updated_at, User.created_at).where(User.id == user_id))
+    row = (await db.execute(stmt)).first()
+    return tuple(row) if row else None
 
-def get_user_profile_by_email(db: Session, email: str) -> UserProfileResponse:
+
+async def get_users_last_changed(db: AsyncSession) -> Optional[datetime]:
+    """Latest change to any user, for the users list ETag.
+
+    Unfiltered on purpose: users entering or leaving a filtered set are edits
+    too, and the max comes from the last entry of ix_users_changed_at rather
+    than a scan, whatever the filters or count mode.
+    """
+    return (await db.execute(select(func.max(USER_CHANGED_AT)))).scalar_one()
+
+
+async def get_user_profile_by_email(db: AsyncSession, email: str) -> UserProfileResponse:
     """Get user profile by email"""
-    user = get_user_by_email(db, email)
+    user = await get_user_by_email(db, email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -188,16 +430,89 @@ def get_user_profile_by_email(db: Session, email: str) -> UserProfileResponse:
     return convert_user_to_profile_response(user)
 
 
-def get_all_users_profiles(db: Session, skip: int = 0, limit: int = 100, include_deleted: bool = False) -> UsersListResponse:
-    """Get all users profiles with pagination"""
-    users = get_all_users(db, skip, limit, include_deleted)
-    total = get_users_count(db, include_deleted)
-    
-    user_profiles = [convert_user_to_profile_response(user) for user in users]
+async def get_all_users_profiles(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    count: Optional[CountMode] = None,
+    fields: Optional[List[str]] = None,
+    filters: Optional[UsersFilter] = None,
+    total: Optional[int] = None
+) -> Dict[str, Any]:
+    """Get a UsersListResponse-shaped page with offset or cursor pagination.
+
+    With ``fields`` only those profile fields are selected and loaded.
+    ``filters`` applies to both the page and the total. A ``total`` the
+    caller already counted is used as is instead of counting again.
+    """
+    after_id = decode_cursor(cursor) if cursor else None
+    count = count or settings.USERS_COUNT_DEFAULT_MODE
+    loads = profile_loads(fields) if fields else USER_PROFILE_LOADS
+    users, has_more = await get_all_users(db, skip, limit, include_deleted, after_id, loads, filters)
+    if total is None:
+        total = await count_users(db, include_deleted, count, filters)
     
-    return UsersListResponse(
-        users=user_profiles,
-        total=total,
-        page=(skip // limit) + 1,
-        per_page=limit
+    return {
+        "users": [convert_user_to_profile_dict(user, fields) for user in users],
+        "total": total,
+        "count_mode": count,
+        "page": (skip // limit) + 1 if after_id is None else None,
+        "per_page": limit,
+        "next_cursor": encode_cursor(users[-1].id) if has_more else None
+    }
+
+
+def csv_cell(value: Any) -> Any:
+    """Flatten a profile value into one CSV cell"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return fast_json.dumps(value).decode()
+    if isinstance(value, datetime):
+        return fast_json.dumps(value).decode().strip('"')
+    return value
+
+
+async def export_users(
+    db: AsyncSession,
+    export_format: ExportFormat = "ndjson",
+    fields: Optional[List[str]] = None,
+    include_deleted: bool = False,
+    filters: Optional[UsersFilter] = None,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[str]:
+    """Stream user profiles as NDJSON lines or CSV rows, one chunk per batch.
+
+    Users come from a single unordered server-side cursor (``yield_per``), so
+    the table is read once with no OFFSET or count. Collections are loaded per
+    batch, and the session only holds users weakly, so each batch is released
+    once written and memory stays flat.
+    """
+    fields = fields or list(PROFILE_FIELDS)
+    query = (
+        select(User)
+        .options(*profile_loads(fields))
+        .where(*users_filter_clauses(include_deleted, filters))
+        .execution_options(yield_per=batch_size or settings.USERS_EXPORT_BATCH_SIZE)
     )
+    result = await db.stream(query)
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if export_format == "csv":
+        writer.writerow(fields)
+    
+    async for users in result.scalars().partitions():
+        rows = [convert_user_to_profile_dict(user, fields) for user in users]
+        if export_format == "csv":
+            writer.writerows([csv_cell(row[field]) for field in fields] for row in rows)
+        else:
+            buffer.writelines(fast_json.dumps(row).decode() + "\n" for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
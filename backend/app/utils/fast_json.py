@@ -0,0 +1,22 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain response data straight to JSON bytes.
+
+    Output matches FastAPI's Pydantic encoding for the types the services
+    return: ISO 8601 datetimes with ``Z`` for UTC, and compact separators.
+    """
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """JSON response for prebuilt dicts; skips response_model validation and jsonable_encoder"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
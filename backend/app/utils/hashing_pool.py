@@ -0,0 +1,103 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+def available_cores() -> int:
+    """Cores this process may run on (CPU affinity where the OS reports it)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+class HashingPool:
+    """Bounded thread pool for CPU-heavy password hashing off the event loop.
+
+    At most ``max_workers`` hashes run at once, and at most ``max_pending``
+    are queued or running per process; further callers wait on an asyncio
+    semaphore instead of piling work onto the executor. bcrypt releases the
+    GIL, so the workers use separate cores.
+
+    With ``max_workers=0`` the host's cores are split between the
+    ``processes`` server workers (0 = one per core), so all pools together
+    run at most one hash per core.
+    """
+
+    def __init__(self, max_workers: int = 0, max_pending: int = 64, processes: int = 1):
+        cores = available_cores()
+        self.max_workers = max_workers or max(1, cores // (processes or cores))
+        self.max_pending = max(max_pending, self.max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+        # Counters
+        self._submitted = 0
+        self._completed = 0
+        self._in_flight = 0
+        self._queue_seconds_total = 0.0
+        self._queue_seconds_max = 0.0
+        self._run_seconds_total = 0.0
+        self._run_seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on the pool, recording queue and run time"""
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_seconds_total += started - queued_at
+                    self._queue_seconds_max = max(self._queue_seconds_max, started - queued_at)
+                    self._run_seconds_total += finished - started
+                    self._run_seconds_max = max(self._run_seconds_max, finished - started)
+
+        try:
+            async with self._semaphore:
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), task)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+
+    def shutdown(self):
+        """Stop the worker threads once queued work has finished"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        """Snapshot of concurrency and queue/run time counters"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "submitted": self._submitted,
+                "completed": completed,
+                "in_flight": self._in_flight,
+                "queue_seconds_avg": round(self._queue_seconds_total / completed, 6) if completed else None,
+                "queue_seconds_max": round(self._queue_seconds_max, 6),
+                "run_seconds_avg": round(self._run_seconds_total / completed, 6) if completed else None,
+                "run_seconds_max": round(self._run_seconds_max, 6),
+            }
@@ -0,0 +1,66 @@
+import base64
+import hashlib
+import json
+from typing import Dict, List, Optional
+from jose import jwk
+
+
+# Members of each key type that make up an RFC 7638 thumbprint
+THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+
+def jwk_thumbprint(public_jwk: dict) -> str:
+    """Compute the RFC 7638 SHA-256 thumbprint of a public JWK"""
+    members = {name: public_jwk[name] for name in THUMBPRINT_MEMBERS[public_jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).rstrip(b"=").decode()
+
+
+def _read_pem(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+class KeyRing:
+    """Signing key plus the public keys accepted for verification.
+
+    Keys are identified by their RFC 7638 thumbprint, which is used as the
+    ``kid`` header of issued tokens. Rotating means pointing the signing key
+    at a new PEM and keeping the previous public key listed for verification
+    until tokens signed with it have expired.
+    """
+
+    def __init__(self, algorithm: str, private_key_path: Optional[str], public_key_paths: List[str]):
+        self.algorithm = algorithm
+        self.signing_key: Optional[str] = None
+        self.signing_kid: Optional[str] = None
+        self.public_jwks: Dict[str, dict] = {}
+
+        if not self.asymmetric:
+            return
+
+        if not private_key_path:
+            raise ValueError(f"JWT_PRIVATE_KEY_PATH is required when ALGORITHM is {algorithm}")
+
+        self.signing_key = _read_pem(private_key_path)
+        self.signing_kid = self._add_public_key(self.signing_key)
+        for path in public_key_paths:
+            self._add_public_key(_read_pem(path))
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm[:2] in ("RS", "ES", "PS")
+
+    def _add_public_key(self, pem: str) -> str:
+        public_jwk = jwk.construct(pem, self.algorithm).public_key().to_dict()
+        kid = jwk_thumbprint(public_jwk)
+        self.public_jwks[kid] = {**public_jwk, "kid": kid, "use": "sig"}
+        return kid
+
+    def verification_key(self, kid: Optional[str]) -> Optional[dict]:
+        """Public JWK for a token's kid, or the signing key's when kid is absent"""
+        return self.public_jwks.get(kid or self.signing_kid or "")
+
+    def jwks(self) -> dict:
+        """JSON Web Key Set of every key currently accepted for verification"""
+        return {"keys": list(self.public_jwks.values())}
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """Run a function on a fixed interval in a daemon thread.
+
+    If the function returns a dict, its numeric values are summed into
+    running totals so callers can report e.g. rows removed since startup.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], Any]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self._func = func
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self._runs = 0
+        self._failures = 0
+        self._seconds_total = 0.0
+        self._last_seconds = 0.0
+        self._last_result: Any = None
+        self._last_error: Optional[str] = None
+        self._totals: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_seconds > 0
+
+    def start(self):
+        """Start the worker thread"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> Any:
+        """Run the function now, recording timing and results"""
+        started = time.perf_counter()
+        try:
+            result = self._func()
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+                self._last_error = str(e)
+            logger.exception("Periodic task %s failed", self.name)
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._runs += 1
+                self._seconds_total += elapsed
+                self._last_seconds = elapsed
+
+        with self._lock:
+            self._last_result = result
+            if isinstance(result, dict):
+                for key, value in result.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        self._totals[key] = self._totals.get(key, 0) + value
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def stats(self) -> dict:
+        """Snapshot of run counters, the last result and running totals"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "interval_seconds": self.interval_seconds,
+                "runs": self._runs,
+                "failures": self._failures,
+                "seconds_total": round(self._seconds_total, 6),
+                "last_seconds": round(self._last_seconds, 6),
+                "last_result": self._last_result,
+                "last_error": self._last_error,
+                "totals": dict(self._totals),
+            }
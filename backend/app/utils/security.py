@@ -1,48 +1,100 @@
 from jose import JWTError, jwt
+from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.core.config import settings
+from app.utils.hashing_pool import HashingPool
+from app.utils.jwt_keys import KeyRing
+from app.utils.ttl_cache import TTLCache
 import hashlib
+import hmac
+import logging
 import secrets
 import string
 
 
+logger = logging.getLogger(__name__)
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS)
+
+# Keeps bcrypt work off the event loop; by default each server worker gets its
+# share of the host's cores rather than a thread per core
+password_hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    processes=settings.SERVER_WORKERS
+)
+
+# Asymmetric signing keys; empty when ALGORITHM is an HMAC algorithm
+jwt_key_ring = KeyRing(
+    settings.ALGORITHM,
+    settings.JWT_PRIVATE_KEY_PATH,
+    [path.strip() for path in settings.JWT_PUBLIC_KEY_PATHS.split(",") if path.strip()]
+)
+
+
 def generate_simple_password(email: str = None) -> str:
     """Generate a simple password for new users"""
     if email and '@' in email:
         # Use local part of email (before @) + "123" for predictable passwords
         local_part = email.split('@')[0].lower()
         password = f"{local_part}123"
-        print(f"[DEBUG] Generated predictable password: '{password}' from email: '{email}'")
+        logger.debug("password.generated", extra={"strategy": "email"})
     else:
         # Fallback to random password if no email provided
         alphabet = string.ascii_letters + string.digits
         password = ''.join(secrets.choice(alphabet) for _ in range(6))
-        print(f"[DEBUG] Generated random password: '{password}'")
+        logger.debug("password.generated", extra={"strategy": "random"})
     
     return password
 
 
-def get_password_hash(password: str) -> str:
-    """Simple password hashing using SHA-256"""
-    print(f"[DEBUG] Hashing password: '{password}'")
-    # Use SHA-256 with a simple salt
+def _legacy_password_hash(password: str) -> str:
+    """Original SHA-256 with a fixed salt, kept only to verify old hashes"""
     salt = "simple_salt_2025"  # Simple salt
-    password_with_salt = password + salt
-    hash_result = hashlib.sha256(password_with_salt.encode()).hexdigest()
-    print(f"[DEBUG] Password hashed successfully: {hash_result[:50]}...")
-    return hash_result
+    return hashlib.sha256((password + salt).encode()).hexdigest()
+
+
+def _is_legacy_hash(hashed_password: str) -> bool:
+    return len(hashed_password) == 64 and all(c in string.hexdigits for c in hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password with bcrypt"""
+    return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Simple password verification"""
-    print(f"[DEBUG] Verifying password: '{plain_password}'")
-    # Hash the plain password and compare
-    expected_hash = get_password_hash(plain_password)
-    is_valid = expected_hash == hashed_password
-    print(f"[DEBUG] Password verification result: {is_valid}")
+    """Verify a password against a bcrypt or legacy SHA-256 hash"""
+    if _is_legacy_hash(hashed_password):
+        is_valid = hmac.compare_digest(_legacy_password_hash(plain_password), hashed_password)
+    else:
+        try:
+            is_valid = pwd_context.verify(plain_password, hashed_password)
+        except ValueError:
+            is_valid = False
+    logger.debug("password.verified", extra={"valid": is_valid})
     return is_valid
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash is legacy SHA-256 or uses outdated bcrypt settings"""
+    return _is_legacy_hash(hashed_password) or pwd_context.needs_update(hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool instead of the event loop"""
+    return await password_hashing_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool instead of the event loop"""
+    return await password_hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -52,6 +104,13 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    if jwt_key_ring.asymmetric:
+        return jwt.encode(
+            to_encode,
+            jwt_key_ring.signing_key,
+            algorithm=settings.ALGORITHM,
+            headers={"kid": jwt_key_ring.signing_kid}
+        )
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -59,7 +118,47 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 def verify_token(token: str):
     """Verify JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if jwt_key_ring.asymmetric:
+            key = jwt_key_ring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+        else:
+            key = settings.SECRET_KEY
+        payload = jwt.decode(token, key, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         return None
+
+
+# Decoded claims keyed by token digest, each evicted at the token's exp
+token_claims_cache = TTLCache(max_entries=settings.TOKEN_CLAIMS_CACHE_MAX_ENTRIES)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def verify_token_cached(token: str) -> Optional[dict]:
+    """Verify JWT token, reusing previously decoded claims for the same token"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_claims_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    if payload and isinstance(payload.get("exp"), (int, float)):
+        token_claims_cache.set(key, payload, payload["exp"])
+    return payload
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> dict:
+    """Dependency returning the claims of a valid bearer token"""
+    payload = verify_token_cached(credentials.credentials) if credentials else None
+    # Refresh tokens are opaque now; this still rejects JWT refresh tokens issued before them
+    if not payload or payload.get("typ") == "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return payload
@@ -0,0 +1,50 @@
+import threading
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+
+class StatementCacheStats:
+    """Count how often executed statements reused SQLAlchemy's compiled SQL cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {stat.name.lower(): 0 for stat in CacheStats}
+
+    def record(self, stat: CacheStats):
+        with self._lock:
+            self._counts[stat.name.lower()] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        cacheable = counts["cache_hit"] + counts["cache_miss"]
+        return {
+            **counts,
+            "hit_ratio": round(counts["cache_hit"] / cacheable, 4) if cacheable else None,
+        }
+
+
+def instrument_statement_cache(sync_engine: Engine) -> StatementCacheStats:
+    """Attach a compiled-cache hit counter to an engine"""
+    stats = StatementCacheStats()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        cache_hit = getattr(context, "cache_hit", None)
+        if cache_hit is not None:
+            stats.record(cache_hit)
+
+    return stats
+
+
+def statement_cache_stats(sync_engine: Engine, stats: StatementCacheStats) -> dict:
+    """Hit/miss counters plus occupancy of the engine's compiled SQL cache"""
+    cache = sync_engine._compiled_cache
+    return {
+        **stats.snapshot(),
+        "entries": len(cache) if cache is not None else 0,
+        "capacity": cache.capacity if cache is not None else 0,
+    }
@@ -0,0 +1,22 @@
+import zlib
+from typing import AsyncIterator, Union
+
+
+async def encode_stream(chunks: AsyncIterator[Union[str, bytes]]) -> AsyncIterator[bytes]:
+    """UTF-8 encode a stream of text chunks"""
+    async for chunk in chunks:
+        yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into one gzip member, chunk by chunk.
+
+    Only the compressor's window is held in memory, so a response of any size
+    can be gzipped while it is being produced.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 16 + 15: gzip header and trailer
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
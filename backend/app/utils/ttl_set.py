@@ -0,0 +1,52 @@
+import hashlib
+import threading
+import time
+from typing import Dict
+
+
+class TTLSet:
+    """Bounded in-memory set whose members expire at a given timestamp.
+
+    Members are stored as 8-byte digests to keep the footprint small. When the
+    set is full even after purging expired members, ``add`` refuses new
+    members instead of evicting live ones.
+    """
+
+    def __init__(self, max_entries: int = 100_000, purge_interval: float = 30.0):
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self._entries: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self._next_purge = time.time() + purge_interval
+
+    @staticmethod
+    def _digest(member: str) -> bytes:
+        return hashlib.blake2b(member.encode(), digest_size=8).digest()
+
+    def add(self, member: str, expires_at: float) -> bool:
+        """Add a member, returning False if it is already present or the set is full"""
+        key = self._digest(member)
+        now = time.time()
+        with self._lock:
+            if now >= self._next_purge or len(self._entries) >= self.max_entries:
+                self._purge(now)
+
+            existing = self._entries.get(key)
+            if existing is not None and existing > now:
+                return False
+            if len(self._entries) >= self.max_entries:
+                return False
+
+            self._entries[key] = expires_at
+            return True
+
+    def __contains__(self, member: str) -> bool:
+        expires_at = self._entries.get(self._digest(member))
+        return expires_at is not None and expires_at > time.time()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self, now: float):
+        self._entries = {key: exp for key, exp in self._entries.items() if exp > now}
+        self._next_purge = now + self.purge_interval
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Concurrency check: one captcha redeemed by many signins at once. Each round
+issues a captcha, then fires --concurrency verify_captcha calls for it through
+asyncio.gather, each on its own session and connection. Exits non-zero unless
+exactly one call per round succeeds. Runs on a scratch database (a temporary
+SQLite file unless --database-url is given; never point it at a real database)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import tempfile
+import time
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.core.database import Base, async_database_url
+from app.models.user import Captcha
+from app.services.captcha_service import create_captcha, verify_captcha
+
+
+def async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return async_database_url(url)
+
+
+async def race(engine, concurrency: int) -> tuple:
+    """Issue one captcha and redeem it from ``concurrency`` sessions at once"""
+    async with AsyncSession(engine) as db:
+        captcha_id = (await create_captcha(db))["captcha_id"]
+        answer = (await db.execute(select(Captcha.captcha_text).where(Captcha.captcha_id == captcha_id))).scalar_one()
+
+    async def attempt():
+        async with AsyncSession(engine) as db:
+            return await verify_captcha(db, captcha_id, answer.lower())
+
+    results = await asyncio.gather(*(attempt() for _ in range(concurrency)), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    return sum(result is True for result in results), errors
+
+
+async def run(args, url: str) -> bool:
+    # NullPool: every attempt gets its own connection, like separate requests
+    engine = create_async_engine(async_url(url), poolclass=NullPool)
+    ok = True
+    started = time.perf_counter()
+    try:
+        for round_ in range(1, args.rounds + 1):
+            successes, errors = await race(engine, args.concurrency)
+            passed = successes == 1 and not errors
+            ok = ok and passed
+            if not passed or args.verbose:
+                print(f"  {'✅' if passed else '❌'} round {round_:>3}: {successes}/{args.concurrency} succeeded"
+                      + (f", {len(errors)} errors (first: {errors[0]!r})" if errors else ""))
+    finally:
+        await engine.dispose()
+    print(f"  {args.rounds} rounds x {args.concurrency} concurrent verifies in {time.perf_counter() - started:.2f} s")
+    return ok
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=20, help="Simultaneous verify_captcha calls per captcha")
+    parser.add_argument("--rounds", type=int, default=20, help="Captchas to race")
+    parser.add_argument("--database-url", help="Scratch database (sync URL); tables are dropped and recreated")
+    parser.add_argument("--verbose", action="store_true", help="Print every round, not only failures")
+    args = parser.parse_args()
+
+    # The race is about the captchas table; stateless tokens never touch it
+    settings.CAPTCHA_STATELESS = False
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{scratch.name}"
+
+    try:
+        print(f"🚀 Racing {args.concurrency} verifies against each of {args.rounds} captchas")
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        print("=" * 70)
+        ok = asyncio.run(run(args, url))
+        print("=" * 70)
+        print("  ✅ every captcha was redeemed exactly once" if ok else "  ❌ captcha redemption raced")
+    finally:
+        if scratch:
+            os.unlink(scratch.name)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worker cold-start time, from a fresh interpreter to ready to serve,
+compared with the old import-time Base.metadata.create_all. Each sample runs
+in its own process, like a newly forked uvicorn worker. Needs an up-to-date
+database (python init_db.py)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import statistics
+import subprocess
+
+WORKER = r"""
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        if LEGACY:
+            from app.core.database import Base, engine
+            Base.metadata.create_all(bind=engine)
+        done = time.perf_counter()
+    return ready, done
+
+ready, done = asyncio.run(boot())
+print(json.dumps({"import": imported - started, "startup": ready - imported, "create_all": done - ready}))
+"""
+
+
+def sample(legacy: bool) -> dict:
+    """Boot one worker in a subprocess and return its phase timings"""
+    output = subprocess.run(
+        [sys.executable, "-c", f"LEGACY = {legacy}\n" + WORKER],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "LOG_LEVEL": "WARNING", "CAPTCHA_POOL_SIZE": "0"},
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10, help="Worker boots per variant")
+    args = parser.parse_args()
+
+    print(f"🚀 Booting {args.runs} workers per variant")
+    print("=" * 70)
+    for label, legacy in (("revision check (lifespan)", False), ("+ create_all (legacy)", True)):
+        runs = [sample(legacy) for _ in range(args.runs)]
+        total = [run["import"] + run["startup"] + (run["create_all"] if legacy else 0) for run in runs]
+        print(f"  {label:<28} median {statistics.median(total) * 1e3:>8.1f} ms  "
+              f"(import {statistics.median(r['import'] for r in runs) * 1e3:.1f} ms, "
+              f"startup {statistics.median(r['startup'] for r in runs) * 1e3:.1f} ms"
+              + (f", create_all {statistics.median(r['create_all'] for r in runs) * 1e3:.1f} ms)" if legacy else ")"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent /v1/users-style requests per second on one event loop,
+comparing a blocking sync Session (the old request path) with the asyncpg
+AsyncSession path. Needs the local Postgres from DATABASE_URL with sample data
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import time
+from sqlalchemy import select, text
+from sqlalchemy.orm import joinedload
+from app.core.database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from app.models.user import User
+from app.services.user_service import get_all_users_profiles
+
+
+def sync_users_query(limit: int, delay: float):
+    """Old request path: the sync Session blocks the event loop for the whole query"""
+    db = SessionLocal()
+    try:
+        if delay:
+            db.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+        return db.execute(select(User).options(
+            joinedload(User.org),
+            joinedload(User.supervisor_details),
+            joinedload(User.mou_info),
+            joinedload(User.reference_documents),
+            joinedload(User.associated_managers)
+        ).where(User.is_deleted == False).limit(limit)).unique().scalars().all()
+    finally:
+        db.close()
+
+
+async def sync_request(limit: int, delay: float):
+    return sync_users_query(limit, delay)
+
+
+async def async_request(limit: int, delay: float):
+    async with AsyncSessionLocal() as db:
+        if delay:
+            await db.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+        return await get_all_users_profiles(db, 0, limit)
+
+
+async def measure(label: str, request, total: int, concurrency: int, limit: int, delay: float):
+    """Run ``total`` requests with at most ``concurrency`` in flight and print the rate"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            await request(limit, delay)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<24} {total / elapsed:>10.1f} req/s  ({elapsed / total * 1e3:>8.2f} ms each)")
+    return total / elapsed
+
+
+async def run(args):
+    # Warm both pools so connection setup is not measured
+    await measure("warm-up (sync)", sync_request, args.concurrency, args.concurrency, args.limit, 0)
+    await measure("warm-up (async)", async_request, args.concurrency, args.concurrency, args.limit, 0)
+    print("-" * 70)
+    before = await measure("sync Session", sync_request, args.requests, args.concurrency, args.limit, args.delay)
+    after = await measure("AsyncSession (asyncpg)", async_request, args.requests, args.concurrency, args.limit, args.delay)
+    print("=" * 70)
+    print(f"  speedup: {after / before:.2f}x")
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per variant")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight; keep <= the pool size")
+    parser.add_argument("--limit", type=int, default=20, help="Users returned per request")
+    parser.add_argument("--delay", type=float, default=0.005, help="Extra server-side pg_sleep per request to model query latency")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.requests} requests per variant, {args.concurrency} concurrent, on one event loop")
+    print("=" * 70)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query plans for the filtered GET /v1/users page and count queries.
+Seeds a scratch database through the Alembic migrations (a temporary SQLite
+file unless --database-url is given; never point it at a real database),
+then EXPLAINs every filter. Exits non-zero if a count, or a page that has to
+sort, falls back to a sequential scan of users; an id-ordered walk that stops
+at the LIMIT is fine. The trigram search index is Postgres-only, so on SQLite
+the search filter is reported but not checked
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from alembic import command
+from sqlalchemy import create_engine, func, insert, select, text
+from app.core.database import Base
+from app.core.migrations import alembic_config
+from app.models.user import User
+from app.schemas.user import UsersFilter
+from app.services.user_service import users_filter_clauses
+
+ROLES = ("customer",) * 90 + ("admin",) * 2 + ("reviewer",) * 8
+STATUSES = ("Engaged",) * 80 + ("Inactive",) * 15 + ("Suspended",) * 5
+ORG_TYPES = ("Startup", "Government", "Academia", "Enterprise", "NGO")
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+CASES = (
+    ("role=reviewer", UsersFilter(role="reviewer")),
+    ("org_type=NGO", UsersFilter(org_type="NGO")),
+    ("status=Suspended", UsersFilter(status="Suspended")),
+    ("is_test_user=true", UsersFilter(is_test_user=True)),
+    ("created last 30 days", UsersFilter(created_from=NOW - timedelta(days=30))),
+    ("role + created range", UsersFilter(role="admin", created_from=NOW - timedelta(days=365), created_to=NOW - timedelta(days=180))),
+    ("search=user12345", UsersFilter(search="user12345")),
+)
+
+
+def seed(url: str, users: int, chunk: int = 50000):
+    """Migrate a fresh schema and insert users with skewed filter columns"""
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    config = alembic_config()
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(1, users + 1, chunk):
+            connection.execute(insert(User), [{
+                "id": i, "first_name": f"First{i}", "last_name": f"Last{i}",
+                "email": f"user{i}@example.com", "email_id": f"user{i}@org.example.com", "password_hash": "x",
+                "role": rng.choice(ROLES), "status": rng.choice(STATUSES), "org_type": rng.choice(ORG_TYPES),
+                "is_test_user": rng.random() < 0.03, "is_deleted": rng.random() < 0.02,
+                "created_at": NOW - timedelta(seconds=rng.randrange(3 * 365 * 86400)),
+            } for i in range(start, min(start + chunk, users + 1))])
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM ANALYZE users"))
+    else:
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+    return engine
+
+
+def postgres_plan(connection, sql: str) -> tuple:
+    """Scan nodes touching users, and execution time, from EXPLAIN ANALYZE"""
+    plan = connection.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")).scalar_one()
+    scans, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Sort":
+            scans.append("Sort")
+        elif node.get("Relation Name") == "users" or node.get("Index Name", "").startswith("ix_users"):
+            scans.append(f"{node['Node Type']}" + (f" ({node['Index Name']})" if "Index Name" in node else ""))
+        nodes.extend(node.get("Plans", []))
+    return scans, plan[0]["Execution Time"] / 1e3
+
+
+def sqlite_plan(connection, sql: str) -> tuple:
+    """Scan steps from EXPLAIN QUERY PLAN, and execution time of the query"""
+    scans = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    started = time.perf_counter()
+    connection.exec_driver_sql(sql).fetchall()
+    return scans, time.perf_counter() - started
+
+
+def reads_whole_table(kind: str, scans: list) -> bool:
+    """A sequential scan under a count, or under a sort before the LIMIT"""
+    seq_scan = any(scan.startswith("Seq Scan") or (scan.startswith("SCAN users") and "INDEX" not in scan) for scan in scans)
+    sorted_ = any(scan == "Sort" or "TEMP B-TREE" in scan for scan in scans)
+    return seq_scan and (kind == "count" or sorted_)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000000, help="Users to seed")
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--database-url", help="Scratch database (sync URL); tables are dropped and recreated")
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{scratch.name}"
+
+    ok = True
+    try:
+        print(f"🚀 Seeding {args.users} users, then explaining each filter")
+        engine = seed(url, args.users)
+        postgres = engine.dialect.name == "postgresql"
+        explain = postgres_plan if postgres else sqlite_plan
+        print("=" * 70)
+        with engine.connect() as connection:
+            for label, filters in CASES:
+                clauses = users_filter_clauses(False, filters)
+                queries = (
+                    ("page", select(User).where(*clauses).order_by(User.id).limit(args.limit + 1)),
+                    ("count", select(func.count()).select_from(User).where(*clauses)),
+                )
+                for kind, query in queries:
+                    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+                    scans, elapsed = explain(connection, sql)
+                    checked = postgres or filters.search is None
+                    regressed = checked and reads_whole_table(kind, scans)
+                    ok = ok and not regressed
+                    mark = "❌" if regressed else ("✅" if checked else "➖")
+                    print(f"  {mark} {label:<22} {kind:<6} {elapsed * 1e3:>8.1f} ms  {'; '.join(scans)}")
+        engine.dispose()
+        print("=" * 70)
+        print("  ✅ every filter is index-backed" if ok else "  ❌ a filter fell back to a full scan")
+    finally:
+        if scratch:
+            os.unlink(scratch.name)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
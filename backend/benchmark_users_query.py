@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Regression check: queries issued and rows fetched for one GET /v1/users page,
+comparing the old all-joinedload query with the current loading strategy.
+Seeds a scratch database (a temporary SQLite file unless --database-url is
+given; never point it at a real database) and exits non-zero if a page costs
+more than --max-queries queries or returns fewer users than requested
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import tempfile
+import time
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, joinedload
+from app.core.database import Base, async_database_url
+from app.models.user import User, Organization, SupervisorDetail, ReferenceDocument, AssociatedManager
+from app.services.user_service import get_all_users
+
+
+def seed(url: str, users: int):
+    """Insert users with an org, two supervisors, three documents and two managers each"""
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(User(
+            id=i, first_name=f"First{i}", last_name=f"Last{i}", email=f"user{i}@example.com",
+            password_hash="x", role="customer", is_deleted=False
+        ) for i in range(1, users + 1))
+        db.flush()
+        for i in range(1, users + 1):
+            db.add(Organization(user_id=i, org_name=f"Org {i}", org_type="Startup"))
+            db.add_all(SupervisorDetail(user_id=i, first_name="S", last_name=str(n), official_email=f"s{n}@example.com") for n in range(2))
+            db.add_all(ReferenceDocument(user_id=i, file_name=f"doc{n}.pdf", blob_file_name=f"blob{n}", role="customer", uploaded_by="admin") for n in range(3))
+            db.add_all(AssociatedManager(user_id=i, application_name=f"app{n}", manager_email=f"m{n}@example.com") for n in range(2))
+        db.commit()
+    engine.dispose()
+
+
+def legacy_query(limit: int):
+    """Original query: every relationship joined, LIMIT applied to joined rows"""
+    return select(User).options(
+        joinedload(User.org),
+        joinedload(User.supervisor_details),
+        joinedload(User.mou_info),
+        joinedload(User.reference_documents),
+        joinedload(User.associated_managers)
+    ).where(User.is_deleted == False).limit(limit)
+
+
+class QueryCounter:
+    """Record every statement an engine runs so its row count can be measured afterwards"""
+
+    def __init__(self, sync_engine):
+        self.statements = []
+        event.listen(sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def rows_fetched(self, url: str) -> int:
+        # Re-run each captured SELECT wrapped in COUNT(*) on a plain DBAPI cursor
+        engine = create_engine(url)
+        total = 0
+        with engine.connect() as connection:
+            cursor = connection.connection.cursor()
+            for statement, parameters in self.statements:
+                if statement.lstrip().upper().startswith("SELECT"):
+                    cursor.execute(f"SELECT count(*) FROM ({statement}) AS q", parameters)
+                    total += cursor.fetchone()[0]
+        engine.dispose()
+        return total
+
+
+async def measure(label: str, url: str, run, limit: int) -> tuple:
+    engine = create_async_engine(async_url(url))
+    counter = QueryCounter(engine.sync_engine)
+    async with AsyncSession(engine) as db:
+        started = time.perf_counter()
+        users = await run(db)
+        elapsed = time.perf_counter() - started
+    await engine.dispose()
+    rows = counter.rows_fetched(url)
+    print(f"  {label:<22} {len(counter.statements):>3} queries  {rows:>7} rows fetched  "
+          f"{len(users):>5}/{limit} users  {elapsed * 1e3:>8.1f} ms")
+    return len(counter.statements), len(users)
+
+
+def async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return async_database_url(url)
+
+
+async def run(args, url: str) -> bool:
+    async def legacy(db):
+        return (await db.execute(legacy_query(args.limit))).unique().scalars().all()
+
+    async def current(db):
+        users, _ = await get_all_users(db, limit=args.limit)
+        return users
+
+    await measure("legacy (all joined)", url, legacy, args.limit)
+    queries, returned = await measure("current", url, current, args.limit)
+    return queries <= args.max_queries and returned == min(args.limit, args.users)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10000, help="Users to seed")
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--max-queries", type=int, default=4, help="Fail above this many queries per page")
+    parser.add_argument("--database-url", help="Scratch database (sync URL); tables are dropped and recreated")
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{scratch.name}"
+
+    try:
+        print(f"🚀 Seeding {args.users} users, then loading one page of {args.limit}")
+        seed(url, args.users)
+        print("=" * 70)
+        ok = asyncio.run(run(args, url))
+        print("=" * 70)
+        print("  ✅ page cost is bounded" if ok else "  ❌ page cost regressed")
+    finally:
+        if scratch:
+            os.unlink(scratch.name)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
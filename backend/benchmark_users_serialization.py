@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialization cost per user for one GET /v1/users page, comparing
+the old path (nested Pydantic models, re-validated against response_model by
+FastAPI, then stdlib json) with row dicts written by orjson. Loads the page
+once from a scratch SQLite database and times only the response body. Exits
+non-zero if the two bodies decode to different JSON or the fast path is slower
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.schemas.user import UsersListResponse
+from app.services.user_service import convert_user_to_profile_dict, convert_user_to_profile_response, get_all_users
+from app.utils.fast_json import FastJSONResponse
+from benchmark_users_query import seed
+
+RESPONSE_FIELD = create_response_field(name="Response_get_all_users", type_=UsersListResponse, mode="serialization")
+
+
+async def legacy_body(users: list, page: dict) -> bytes:
+    """Models per user, FastAPI's response_model validation, then JSONResponse"""
+    model = UsersListResponse(users=[convert_user_to_profile_response(user) for user in users], **page)
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=model)
+    return JSONResponse(content).body
+
+
+async def fast_body(users: list, page: dict) -> bytes:
+    """Plain dicts straight from the rows, encoded once by orjson"""
+    return FastJSONResponse({"users": [convert_user_to_profile_dict(user) for user in users], **page}).body
+
+
+async def timed(body, users: list, page: dict, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        content = await body(users, page)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), content
+
+
+async def run(args, url: str) -> bool:
+    engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:", 1))
+    async with AsyncSession(engine) as db:
+        users, _ = await get_all_users(db, limit=args.limit)
+        page = {"total": args.users, "count_mode": "exact", "page": 1, "per_page": args.limit, "next_cursor": None}
+        legacy, legacy_content = await timed(legacy_body, users, page, args.runs)
+        fast, fast_content = await timed(fast_body, users, page, args.runs)
+    await engine.dispose()
+
+    for label, elapsed, content in (("pydantic + json", legacy, legacy_content), ("row dicts + orjson", fast, fast_content)):
+        print(f"  {label:<20} {elapsed * 1e3:>8.2f} ms/page  {elapsed / len(users) * 1e6:>7.1f} µs/user  "
+              f"{len(content) / 1024:>7.1f} KiB")
+    print(f"  speedup: {legacy / fast:.1f}x")
+
+    same = json.loads(legacy_content) == json.loads(fast_content)
+    if not same:
+        print("  ❌ response bodies differ")
+    return same and fast < legacy
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000, help="Users to seed")
+    parser.add_argument("--limit", type=int, default=1000, help="Page size")
+    parser.add_argument("--runs", type=int, default=20, help="Timed serializations per path")
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    url = f"sqlite:///{scratch.name}"
+    try:
+        print(f"🚀 Serializing a page of {args.limit} users, {args.runs} runs per path")
+        seed(url, args.users)
+        print("=" * 70)
+        ok = asyncio.run(run(args, url))
+        print("=" * 70)
+        print("  ✅ fast path matches and is faster" if ok else "  ❌ fast path regressed")
+    finally:
+        os.unlink(scratch.name)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import SessionLocal
 from app.models.user import User, Organization, SupervisorDetail, MouInfo, ReferenceDocument, AssociatedManager
 from app.utils.security import get_password_hash
 from datetime import datetime, timedelta
@@ -18,7 +18,7 @@ def create_sample_data():
     """Create sample data for testing"""
     
     # Get database session
-    db = next(get_db())
+    db = SessionLocal()
     
     try:
         print("Creating sample data...")
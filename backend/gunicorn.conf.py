@@ -0,0 +1,48 @@
+"""
+Production server configuration, driven by Settings (.env / environment)
+
+    gunicorn -c gunicorn.conf.py app.main:app
+    python -m app.main
+
+Graceful reload: ``kill -HUP <master>`` starts fresh workers and lets the old
+ones finish in-flight requests. With SERVER_PRELOAD the code is loaded once in
+the master, so deploy new code with ``kill -USR2 <master>`` (new master) and
+then ``kill -QUIT <old master>`` instead.
+
+Each worker is a separate process with its own in-memory caches; see the
+notes on per-worker state below and in the README.
+"""
+
+from app.core.config import settings
+from app.core.server import check_multi_worker, reset_after_fork, worker_count
+
+bind = f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+workers = worker_count()
+
+# Per-process state: stateless captcha replay protection is refused with more
+# than one worker. Read-your-writes stickiness for replicas (DATABASE_REPLICA_URLS)
+# only covers later requests served by the same worker; others may read a
+# replica up to REPLICA_MAX_LAG_SECONDS behind right after a write
+check_multi_worker(workers)
+worker_class = "app.core.server.UvicornWorker"
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = settings.SERVER_PRELOAD
+
+# Recycle workers to cap slow memory growth; jitter avoids restarting all at once
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+timeout = settings.SERVER_WORKER_TIMEOUT_SECONDS
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+keepalive = settings.SERVER_KEEPALIVE_SECONDS
+backlog = settings.SERVER_BACKLOG
+
+# Access logs come from uvicorn through the app's logging queue
+accesslog = None
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def post_fork(server, worker):
+    reset_after_fork()
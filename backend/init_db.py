@@ -8,16 +8,17 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine, Base
+from alembic import command
+from app.core.database import SessionLocal
+from app.core.migrations import alembic_config
 from app.models.user import User
 from app.utils.security import get_password_hash
 
 def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    """Create or upgrade database tables with Alembic"""
+    print("Applying database migrations...")
+    command.upgrade(alembic_config(), "head")
+    print("Database tables are up to date!")
 
 def create_sample_user():
     """Create a sample user for testing"""
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Migration script to drop the write-only image_data column from captchas table
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_captcha_image_data():
+    """Drop image_data column from captchas table"""
+    
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("ALTER TABLE captchas DROP COLUMN IF EXISTS image_data"))
+            conn.commit()
+            
+            logger.info("✅ Dropped captchas.image_data column")
+            return True
+            
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        return False
+
+def main():
+    """Main function"""
+    print("🚀 Running captcha image_data migration...")
+    print("=" * 50)
+    
+    if migrate_captcha_image_data():
+        print("\n🎉 Migration completed successfully!")
+        print("\n📝 Captcha images are now served from GET /v1/captcha/{captcha_id}.png")
+    else:
+        print("\n❌ Migration failed!")
+
+if __name__ == "__main__":
+    main()
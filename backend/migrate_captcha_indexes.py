@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the indexes used by the captcha reaper
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAPTCHA_INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_captchas_expires_at ON captchas (expires_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_captchas_used ON captchas (id) WHERE is_used"
+]
+
+def migrate_captcha_indexes():
+    """Create captcha reaper indexes without locking out writes"""
+    
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in CAPTCHA_INDEXES:
+                conn.execute(text(statement))
+                logger.info(f"Applied: {statement}")
+            
+            logger.info("✅ Captcha index migration completed successfully!")
+            return True
+            
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        return False
+
+def main():
+    """Main function"""
+    print("🚀 Running captcha index migration...")
+    print("=" * 50)
+    
+    if migrate_captcha_indexes():
+        print("\n🎉 Migration completed successfully!")
+        print("\n📝 New indexes on captchas table:")
+        print("- ix_captchas_expires_at: Chunked deletes of expired captchas")
+        print("- ix_captchas_used: Partial index over used captchas")
+    else:
+        print("\n❌ Migration failed!")
+
+if __name__ == "__main__":
+    main()